@@ -1,59 +1,53 @@
 import cv2
-import numpy as np
 import time
 import os
+import argparse
+import threading
 
-def apply_filter(frame, filter_type):
-    """Görüntüye farklı efektler uygular
+from encoders import ENCODER_BACKENDS, FFmpegEncoder, create_encoder, encoder_extension, measure_fps
+from filters import FILTER_NAMES
+from hud import text_sprite
+from metrics import NULL_METRICS, StageMetrics, report_metrics
+from mjpeg import MJPEGServer
+from pipeline import FramePipeline, open_journal, open_source, scaled_size
+from recorder import StreamingRecorder, FrameStore
+from recordings import RecordingIndex
+from scanner import TimeWarpScanner
+
+def time_warp_scan(record_mode='stream', drop_policy='block', queue_size=32, ram_limit_mb=1024,
+                   source=0, threaded=False, metrics=None, show_hud=False, sweep_seconds=None,
+                   encoder='opencv', codec=None, journal_path=None, http_port=None, http_host='127.0.0.1',
+                   process_scale=1.0, record_scale=1.0):
+    """Ana Time Warp Scan fonksiyonu - kamera görüntüsünü tarayarak efekt oluşturur
     
     Parametreler:
-    frame -- İşlenecek görüntü
-    filter_type -- Uygulanacak filtre tipi (0-5 arası değer)
-    
-    Dönüş:
-    Filtre uygulanmış görüntü
+    record_mode -- 'stream': kareler kayıt sırasında arka planda diske akıtılır,
+                   'memory': kareler 's' tuşuna basılana kadar kare deposunda tutulur
+    drop_policy -- Akış kaydında kuyruk dolunca davranış ('block', 'drop_oldest', 'drop_newest')
+    queue_size -- Akış kaydında yazıcıyı bekleyebilecek en fazla kare sayısı
+    ram_limit_mb -- Bellek modunda RAM'de tutulacak kareler için üst sınır (MB),
+                    aşılırsa kareler diske taşar
+    source -- Kamera indeksi veya video dosyası
+    threaded -- Yakalama, işleme ve gösterim ayrı iş parçacıklarında mı çalışsın?
+    metrics -- Aşama sürelerinin kaydedileceği StageMetrics (None ise ölçüm yapılmaz)
+    show_hud -- Aşama süreleri görüntünün üzerine yazılsın mı?
+    sweep_seconds -- Verilirse tarama kare sayısıyla değil zamanla ilerler:
+                     bir eksenin taranma süresi (saniye)
+    encoder -- Kayıt kodlayıcısı ('opencv' veya 'ffmpeg')
+    codec -- Kodlayıcı codec'i (None ise kodlayıcının varsayılanı)
+    journal_path -- Verilirse ham (çevrilmiş) kamera kareleri bu kare günlüğüne
+                    yazılır; günlük sonra --source veya --input ile yeniden işlenebilir
+    http_port -- Verilirse ekrandaki görüntü bu porttan MJPEG olarak da yayınlanır
+    http_host -- MJPEG yayınının dinleyeceği adres
+    process_scale -- Efektin hesaplandığı ve önizlemenin gösterildiği çözünürlüğün
+                     kamera çözünürlüğüne oranı (ör. 0.5); pencere kamera boyutuna büyütülür
+    record_scale -- Kaydedilen videonun kamera çözünürlüğüne oranı; kareler
+                    kayıt iş parçacığında bu boyuta ölçeklenir. Yalnızca çıktı
+                    boyutunu değiştirir: kareler process_scale boyutundan
+                    büyütüldüğü için kayıt daha fazla ayrıntı içermez
     """
-    # Boş veya çok küçük frame kontrolü - hataları önlemek için
-    if frame is None or frame.size == 0 or frame.shape[0] == 0 or frame.shape[1] == 0:
-        return frame
-        
-    if filter_type == 0:  # Normal - filtre yok, görüntüyü olduğu gibi döndür
-        return frame
-    elif filter_type == 1:  # Siyah-beyaz filtresi
-        # Görüntüyü önce gri tonlamaya çevir, sonra tekrar BGR formatına dönüştür
-        return cv2.cvtColor(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), cv2.COLOR_GRAY2BGR)
-    elif filter_type == 2:  # Negatif filtresi - renkleri ters çevir
-        return 255 - frame  # Her piksel değerinden 255 çıkararak negatif elde edilir
-    elif filter_type == 3:  # Sepya filtresi - eski fotoğraf görünümü
-        # Renk dönüşüm matrisi - sepya tonu için renk değerlerini ayarlar
-        sepya = np.array([[0.272, 0.534, 0.131],
-                          [0.349, 0.686, 0.168],
-                          [0.393, 0.769, 0.189]])
-        # Matris çarpımı ile sepya efekti uygulama
-        return cv2.transform(frame, sepya)
-    elif filter_type == 4:  # Kenar algılama filtresi
-        # Canny kenar algılama algoritması
-        edges = cv2.Canny(frame, 100, 200)  # Eşik değerleri 100 ve 200
-        # Gri tonlamalı kenar görüntüsünü BGR'ye dönüştür
-        return cv2.cvtColor(edges, cv2.COLOR_GRAY2BGR)
-    elif filter_type == 5:  # Mozaik filtresi - pikselleştirme efekti
-        h, w = frame.shape[:2]  # Görüntünün yüksekliği ve genişliği
-        # Çok küçük görüntüleri kontrol et - sıfır bölme hatalarını önlemek için
-        new_w = max(1, w//10)  # En az 1 piksel genişliğinde olmalı
-        new_h = max(1, h//10)  # En az 1 piksel yüksekliğinde olmalı
-        
-        if new_w < w and new_h < h:  # Boyutlar küçülmelidir
-            # Görüntüyü küçültüp sonra tekrar büyüterek pikselleştirme efekti oluşturma
-            temp = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
-            # INTER_NEAREST ile büyültme - piksel tekrarı ile mozaik efekti oluşur
-            return cv2.resize(temp, (w, h), interpolation=cv2.INTER_NEAREST)
-        else:
-            return frame  # Boyut küçültemiyorsak olduğu gibi bırak
-    # Diğer tüm durumlar için orijinal görüntüyü döndür
-    return frame
-
-def time_warp_scan():
-    """Ana Time Warp Scan fonksiyonu - kamera görüntüsünü tarayarak efekt oluşturur"""
+    metrics = metrics or NULL_METRICS
+    
     # Kullanıcıdan tarama yönünü seçmesini iste
     print("Tarama yönünü seçin:")
     print("1: Yukarıdan Aşağıya")
@@ -70,9 +64,12 @@ def time_warp_scan():
     print("4: Kenar Algılama")
     print("5: Mozaik")
     filter_type = int(input("Filtre seçin (0-5): "))  # Filtre seçimini tam sayıya dönüştür
+    if direction not in ('1', '2', '3') or filter_type not in range(6):
+        print("Geçersiz seçim!")
+        return
     
-    # Kamerayı başlat - 0 parametresi varsayılan kamerayı seçer
-    cap = cv2.VideoCapture(0)
+    # Kamerayı başlat - 0 parametresi varsayılan kamerayı seçer (.twj ise kare günlüğü oynatılır)
+    cap, live = open_source(source)
     
     # Kamera açılamazsa hata mesajı ver ve fonksiyondan çık
     if not cap.isOpened():
@@ -80,208 +77,131 @@ def time_warp_scan():
         return
     
     # İlk kareyi al ve boyutlarını öğren
-    ret, frame = cap.read()  # ret: okuma başarılı mı, frame: kamera görüntüsü
+    ret, raw = cap.read()  # ret: okuma başarılı mı, raw: kamera görüntüsü
     if not ret:
         print("Kare yakalanamadı!")
         return
     
-    # Sonuç görüntüsünü oluştur (başlangıçta tamamen siyah)
-    height, width, _ = frame.shape  # Görüntünün boyutlarını al
-    result = np.zeros_like(frame)  # frame ile aynı boyutta sıfırlardan oluşan dizi
+    height, width, _ = raw.shape  # Görüntünün boyutlarını al
+    camera_size = (width, height)
+    record_size = scaled_size(width, height, record_scale)
+    # Efekt, yazılar ve önizleme işleme boyutunda; yalnızca kayıt record_size boyutunda
+    width, height = scaled_size(width, height, process_scale)
     
-    # Tarama çizgisinin başlangıç pozisyonları
-    scan_line_pos_v = 0  # Dikey tarama için (yukarıdan aşağıya)
-    scan_line_pos_h = 0  # Yatay tarama için (soldan sağa)
+    # Ham kare günlüğü - aynı çekimi farklı filtre/yönlerle yeniden işlemek için
+    journal = open_journal(journal_path, cap, live, raw) if journal_path else None
     
-    # Tarama hızı (piksel/kare) - her karede tarama çizgisi kaç piksel ilerleyecek
-    scan_speed = 2
-    
-    # Video kayıt değişkenleri
-    video_frames = []  # Kaydedilecek kareleri tutacak liste
-    is_recording = True  # Kayıt durumu - başlangıçta kayıt yapılıyor
-    
-    # Tarama duraklatma değişkeni
-    is_paused = False  # Başlangıçta duraklama yok
+    # Efekt motoru: sonuç görüntüsü (başlangıçta siyah), tarama çizgilerinin
+    # pozisyonları, tamamlanma ve duraklatma durumu. Tarama hızı tam çözünürlükte
+    # 2 piksel/kare; küçük ölçekte hız kesirli olarak ölçeklenir, böylece tarama
+    # aynı sayıda karede biter. sweep_seconds verilirse çizgiler kamera zaman
+    # damgalarına göre ilerler.
+    scanner = TimeWarpScanner(width, height, direction, filter_type, scan_speed=2 * process_scale,
+                              sweep_seconds=sweep_seconds, metrics=metrics, verbose=True)
     
     # Videolar için klasör oluştur (eğer yoksa)
     if not os.path.exists('time_warp_videos'):
         os.makedirs('time_warp_videos')  # Klasör oluştur
     
-    # Tarama tamamlandı mı? Başlangıçta hayır.
-    scan_completed_v = False  # Dikey tarama tamamlandı mı?
-    scan_completed_h = False  # Yatay tarama tamamlandı mı?
+    # Kayıt dizini - kaydedilen her video çözünürlük, süre, yön ve filtre bilgisiyle eklenir
+    index = RecordingIndex('time_warp_videos')
     
-    # Aktif filtre - başlangıçta kullanıcının seçtiği filtre
-    current_filter = filter_type
+    # Video kayıt değişkenleri
+    video_frames = None  # Kaydedilecek kareleri tutacak depo (bellek modu)
+    frame_times = []  # Depodaki karelerin zaman damgaları - kayıt FPS'i bunlardan ölçülür
+    recorder = None  # Arka plan yazıcısı (akış modu)
+    if record_mode == 'stream':
+        recorder = StreamingRecorder('time_warp_videos', queue_size=queue_size, policy=drop_policy,
+                                     metrics=metrics, backend=encoder, codec=codec, index=index, size=record_size)
+    else:
+        video_frames = FrameStore(ram_limit_mb, spill_dir='time_warp_videos')
+    is_recording = True  # Kayıt durumu - başlangıçta kayıt yapılıyor
     
     # Kılavuz metni - ekranın altında gösterilecek tuş bilgileri
     help_text = "ESC: Çıkış | SPACE: Duraklat/Devam | R: Sıfırla | S: Kaydet | F: Filtre Değiştir"
     
-    # Ana döngü - her iterasyon bir kare işler
-    while True:
-        # Kameradan yeni bir kare al
-        ret, frame = cap.read()
-        if not ret:  # Kare alınamadıysa döngüden çık
-            break
-        
-        # Ayna görüntüsü (selfie modu gibi) - yatay eksende çevirme
-        frame = cv2.flip(frame, 1)  # 1: yatay eksende çevirme
-        
-        # Mevcut sonuç görüntüsünün bir kopyasını oluştur (üzerinde değişiklik yapılacak)
-        current_result = result.copy()
-        
-        # Tarama yönüne göre işlemleri yap
-        # Çift yönlü tarama - hem yatay hem dikey
-        if direction == '3':
-            try:
-                # Önce yatay (soldan sağa) taramayı işle
-                if scan_line_pos_h < width and not is_paused:
-                    # Yatay tarama - geçtiği kısım filtrelenir
-                    if not scan_completed_h:
-                        # Tarama çizgisinin geçtiği kısımın boş olmadığından emin ol
-                        if scan_line_pos_h < width - scan_speed:
-                            # Mevcut sütunlara filtre uygula
-                            filtered_slice = apply_filter(frame[:, scan_line_pos_h:scan_line_pos_h+scan_speed], current_filter)
-                            # Filtrelenmiş sonucu sonuç görüntüsüne ekle
-                            result[:, scan_line_pos_h:scan_line_pos_h+scan_speed] = filtered_slice
-                        # Tarama çizgisinin pozisyonunu güncelle
-                        scan_line_pos_h += scan_speed
-                        # Eğer yatay tarama tamamlandıysa bunu işaretle
-                        if scan_line_pos_h >= width:
-                            scan_completed_h = True
-                            print("Yatay tarama tamamlandı!")
-                
-                # Sonra dikey (yukarıdan aşağıya) taramayı işle
-                if scan_line_pos_v < height and not is_paused:
-                    # Dikey tarama - geçtiği kısım filtrelenir
-                    if not scan_completed_v:
-                        # Tarama çizgisinin geçtiği kısımın boş olmadığından emin ol
-                        if scan_line_pos_v < height - scan_speed:
-                            # Mevcut satırlara filtre uygula
-                            filtered_slice = apply_filter(frame[scan_line_pos_v:scan_line_pos_v+scan_speed, :], current_filter)
-                            # Filtrelenmiş sonucu sonuç görüntüsüne ekle
-                            result[scan_line_pos_v:scan_line_pos_v+scan_speed, :] = filtered_slice
-                        # Tarama çizgisinin pozisyonunu güncelle
-                        scan_line_pos_v += scan_speed
-                        # Eğer dikey tarama tamamlandıysa bunu işaretle
-                        if scan_line_pos_v >= height:
-                            scan_completed_v = True
-                            print("Dikey tarama tamamlandı!")
-                
-                # Henüz taranmamış kısımları canlı kameradan al
-                if scan_line_pos_h < width:
-                    # Yatay çizginin sağındaki kısmı canlı kameradan al
-                    current_result[:, scan_line_pos_h:] = frame[:, scan_line_pos_h:]
-                if scan_line_pos_v < height:
-                    # Dikey çizginin altındaki ve yatay çizginin solundaki kısmı güncelle
-                    current_result[scan_line_pos_v:, :scan_line_pos_h] = frame[scan_line_pos_v:, :scan_line_pos_h]
-                
-                # Tarama çizgilerini çiz
-                if scan_line_pos_h < width:
-                    # Yatay tarama için mavi dikey çizgi çiz
-                    cv2.line(current_result, (scan_line_pos_h, 0), (scan_line_pos_h, height), (255, 0, 0), 2)
-                if scan_line_pos_v < height:
-                    # Dikey tarama için yeşil yatay çizgi çiz
-                    cv2.line(current_result, (0, scan_line_pos_v), (width, scan_line_pos_v), (0, 255, 0), 2)
-            except Exception as e:
-                # Hata yakalama - hata durumunda çökmeyi önle
-                print(f"Çift yönlü tarama hatası: {e}")
-                
-        elif direction == '1':  # Yukarıdan Aşağıya tarama
-            try:
-                if scan_line_pos_v < height and not is_paused:
-                    # Tarama çizgisinden sonraki kısmı canlı kameradan al
-                    current_result[scan_line_pos_v:, :] = frame[scan_line_pos_v:, :]
-                    
-                    # Tarama çizgisinin geçtiği kısmı filtreleyerek sonuç görüntüsüne kaydet
-                    # Taşma olmamasını sağla
-                    if scan_line_pos_v < height - scan_speed:
-                        # Mevcut satırlara filtre uygula
-                        filtered_slice = apply_filter(frame[scan_line_pos_v:scan_line_pos_v+scan_speed, :], current_filter)
-                        # Filtrelenmiş sonucu sonuç görüntüsüne ekle
-                        result[scan_line_pos_v:scan_line_pos_v+scan_speed, :] = filtered_slice
-                    
-                    # Tarama çizgisinin pozisyonunu güncelle
-                    scan_line_pos_v += scan_speed
-                    
-                    # Tarama tamamlandı mı kontrol et
-                    if scan_line_pos_v >= height and not scan_completed_v:
-                        scan_completed_v = True
-                        print("Tarama tamamlandı! Videoyu kaydetmek için 's' tuşuna basın.")
-                else:
-                    # Duraklatıldığında canlı kamera görüntüsünü tarama çizgisinin altında göster
-                    current_result[scan_line_pos_v:, :] = frame[scan_line_pos_v:, :]
-                
-                # Tarama çizgisini çiz (mavi renkte)
-                if scan_line_pos_v < height:
-                    # Yatay mavi çizgi çiz
-                    cv2.line(current_result, (0, scan_line_pos_v), (width, scan_line_pos_v), (255, 0, 0), 2)
-            except Exception as e:
-                # Hata yakalama
-                print(f"Dikey tarama hatası: {e}")
-                
-        elif direction == '2':  # Soldan Sağa tarama
-            try:
-                if scan_line_pos_h < width and not is_paused:
-                    # Tarama çizgisinden sonraki kısmı canlı kameradan al
-                    current_result[:, scan_line_pos_h:] = frame[:, scan_line_pos_h:]
-                    
-                    # Tarama çizgisinin geçtiği kısmı filtreleyerek sonuç görüntüsüne kaydet
-                    # Taşma olmamasını sağla
-                    if scan_line_pos_h < width - scan_speed:
-                        # Mevcut sütunlara filtre uygula
-                        filtered_slice = apply_filter(frame[:, scan_line_pos_h:scan_line_pos_h+scan_speed], current_filter)
-                        # Filtrelenmiş sonucu sonuç görüntüsüne ekle
-                        result[:, scan_line_pos_h:scan_line_pos_h+scan_speed] = filtered_slice
-                    
-                    # Tarama çizgisinin pozisyonunu güncelle
-                    scan_line_pos_h += scan_speed
-                    
-                    # Tarama tamamlandı mı kontrol et
-                    if scan_line_pos_h >= width and not scan_completed_h:
-                        scan_completed_h = True
-                        print("Tarama tamamlandı! Videoyu kaydetmek için 's' tuşuna basın.")
-                else:
-                    # Duraklatıldığında canlı kamera görüntüsünü tarama çizgisinin sağında göster
-                    current_result[:, scan_line_pos_h:] = frame[:, scan_line_pos_h:]
-                
-                # Tarama çizgisini çiz (mavi renkte)
-                if scan_line_pos_h < width:
-                    # Dikey mavi çizgi çiz
-                    cv2.line(current_result, (scan_line_pos_h, 0), (scan_line_pos_h, height), (255, 0, 0), 2)
-            except Exception as e:
-                # Hata yakalama
-                print(f"Yatay tarama hatası: {e}")
-        
+    # Ekran yazıları bir kez çizilip her karede yalnızca kopyalanır;
+    # filtre adı yalnızca 'f' ile filtre değişince yeniden alınır.
+    # Yazı boyutları ve konumları işleme ölçeğiyle küçülür, büyütülen pencerede aynı görünür.
+    def sprite(text, font_scale, color, thickness):
+        return text_sprite(text, font_scale * process_scale, color, max(1, round(thickness * process_scale)))
+    
+    def px(value):
+        return round(value * process_scale)
+    
+    rec_sprite = sprite("REC", 1, (0, 0, 255), 2)
+    pause_sprite = sprite("||", 1, (0, 165, 255), 2)
+    help_sprite = sprite(help_text, 0.5, (255, 255, 255), 1)
+    filter_sprite = sprite(f"Filtre: {FILTER_NAMES[scanner.filter_type]}", 0.7, (255, 255, 0), 2)
+    
+    # İşleme aşaması ile tuş kontrolü farklı iş parçacıklarında olabilir
+    state_lock = threading.Lock()
+    
+    def process(frame, current_result, timestamp):
+        with state_lock:
+            return scanner.step(frame, current_result, timestamp)
+    
+    # Tarayıcıdan izleme - her kare bir kez kodlanıp bütün izleyicilere gönderilir
+    http = MJPEGServer(http_port, http_host, title='Time Warp Scan') if http_port is not None else None
+    if http is not None:
+        print(f"MJPEG yayını: {http.address}")
+    
+    # Yakalama -> işleme -> gösterim. Tamponlar havuzdan yeniden kullanılır,
+    # kare başına bellek ayrılmaz.
+    scaled = (width, height) != camera_size
+    pipe = FramePipeline(cap, process, live=live, threaded=threaded, metrics=metrics, journal=journal,
+                         size=(width, height) if scaled else None)
+    if scaled:
+        # Önizleme penceresi küçük kareyi kamera boyutuna büyüterek gösterir
+        cv2.namedWindow('Time Warp Scan', cv2.WINDOW_NORMAL)
+        cv2.resizeWindow('Time Warp Scan', *camera_size)
+    
+    # Ana döngü - her iterasyon bir kare gösterir
+    for current_result, timestamp in pipe.frames():
         # Kayıt için kareyi listeye ekle
         if is_recording:
-            # Her kareyi video için sakla
-            video_frames.append(current_result.copy())
+            # Her kareyi video için sakla (akış modunda yazıcı kuyruğuna gönder)
+            with metrics.stage('kayıt'):
+                if recorder is not None:
+                    recorder.write(current_result, timestamp)
+                else:
+                    video_frames.append(current_result)  # Depoya kopyalanır
+                    frame_times.append(timestamp)
+        
+        with metrics.stage('yazı'):
+            if is_recording:
+                # Kayıt bilgisini göster (kırmızı REC yazısı)
+                rec_sprite.blit(current_result, (px(20), px(40)))
             
-            # Kayıt bilgisini göster (kırmızı REC yazısı)
-            cv2.putText(current_result, "REC", (20, 40), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+            # Aktif filtre bilgisini göster
+            # Ekranın sağ üst köşesine filtre adını yaz
+            filter_sprite.blit(current_result, (width - px(250), px(40)))
+            
+            # Duraklatma durumunda küçük bir gösterge
+            if scanner.paused:
+                # Ekranın ortasında duraklatma simgesi göster
+                pause_sprite.blit(current_result, (width//2 - px(10), px(40)))
+                           
+            # Kılavuz metnini göster (ekranın altında)
+            help_sprite.blit(current_result, (px(20), height - px(20)))
         
-        # Aktif filtre bilgisini göster
-        filter_names = ["Normal", "Siyah-Beyaz", "Negatif", "Sepya", "Kenar Algılama", "Mozaik"]
-        # Ekranın sağ üst köşesine filtre adını yaz
-        cv2.putText(current_result, f"Filtre: {filter_names[current_filter]}", (width-250, 40), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
+        # Aşama süreleri (kayda girmez, yalnızca ekranda)
+        metrics.frame()
+        if show_hud:
+            metrics.draw_hud(current_result)
         
-        # Duraklatma durumunda küçük bir gösterge
-        if is_paused:
-            # Ekranın ortasında duraklatma simgesi göster
-            cv2.putText(current_result, "||", (width//2-10, 40), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 165, 255), 2)
-                       
-        # Kılavuz metnini göster (ekranın altında)
-        cv2.putText(current_result, help_text, (20, height-20), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+        # İzleyici varsa kareyi yayınla (yavaş izleyiciler kare atlar, döngü beklemez)
+        if http is not None:
+            with metrics.stage('yayın'):
+                http.publish(current_result)
         
         # Sonuç görüntüsünü göster
-        cv2.imshow('Time Warp Scan', current_result)
-        
-        # Tuş kontrolü - 1ms bekle ve basılan tuşun ASCII kodunu al
-        key = cv2.waitKey(1)
+        with metrics.stage('gösterim'):
+            cv2.imshow('Time Warp Scan', current_result)
+            pipe.release(current_result)  # Tampon bir sonraki kare için havuza döner
+            
+            # Tuş kontrolü - 1ms bekle ve basılan tuşun ASCII kodunu al
+            key = cv2.waitKey(1)
         
         # ESC tuşuna basılırsa çık
         if key == 27:  # ESC tuşunun ASCII kodu
@@ -290,71 +210,294 @@ def time_warp_scan():
         # 'r' tuşuna basılırsa efekti sıfırla
         elif key == ord('r'):
             # Kaydı sıfırla
-            video_frames = []  # Video kare listesini temizle
+            if recorder is not None:
+                recorder.discard()  # Yazılmakta olan çekimi sil
+            else:
+                video_frames.clear()  # Kare deposunu temizle
+                frame_times.clear()
             is_recording = True  # Kayıt durumunu aktif et
-            is_paused = False  # Duraklatma durumunu kapat
             
             # Efekti sıfırla - her şeyi başlangıç durumuna getir
-            result = np.zeros_like(frame)  # Sonuç görüntüsünü siyahla doldur
-            scan_line_pos_v = 0  # Dikey tarama çizgisini başa al
-            scan_line_pos_h = 0  # Yatay tarama çizgisini başa al
-            scan_completed_v = False  # Dikey tarama tamamlanma durumunu sıfırla
-            scan_completed_h = False  # Yatay tarama tamamlanma durumunu sıfırla
+            with state_lock:
+                scanner.reset()  # Sonuç görüntüsünü siyahla doldur, tarama çizgilerini ve durumları sıfırla
             
         # 's' tuşuna basılırsa videoyu kaydet
-        elif key == ord('s') and (scan_completed_v or scan_completed_h):
-            # Kaydetme fonksiyonunu çağır
-            save_video(video_frames, width, height)
-            video_frames = []  # Belleği temizle
+        elif key == ord('s') and scanner.completed:
+            if recorder is not None:
+                # Dosyayı arka planda kapat - döngü beklemeden devam eder
+                video_path = new_video_path(recorder.extension)
+                print(f"Video kaydediliyor: {video_path}")
+                recorder.save(video_path, direction, scanner.filter_type)
+            else:
+                # Kaydetme fonksiyonunu çağır - FPS kameranın gerçek hızından ölçülür
+                save_video(video_frames, *record_size, measure_fps(frame_times), encoder, codec,
+                           index, direction, scanner.filter_type)
+                video_frames.clear()  # Depoyu sonraki çekim için boşalt
+                frame_times.clear()
             
         # Space tuşuna basılırsa taramayı durdur/devam ettir
         elif key == 32:  # Space tuşunun ASCII kodu
-            is_paused = not is_paused  # Duraklatma durumunu tersine çevir
-            if is_paused:
+            with state_lock:
+                scanner.paused = not scanner.paused  # Duraklatma durumunu tersine çevir
+            if scanner.paused:
                 print("Tarama duraklatıldı. Devam etmek için tekrar SPACE tuşuna basın.")
             else:
                 print("Tarama devam ediyor.")
                 
         # 'f' tuşuna basılırsa filtre değiştir
         elif key == ord('f'):
-            current_filter = (current_filter + 1) % 6  # 6 farklı filtre (0-5)
-            print(f"Filtre değiştirildi: {filter_names[current_filter]}")
+            with state_lock:
+                scanner.set_filter((scanner.filter_type + 1) % 6)  # 6 farklı filtre (0-5)
+            filter_sprite = sprite(f"Filtre: {FILTER_NAMES[scanner.filter_type]}", 0.7, (255, 255, 0), 2)
+            print(f"Filtre değiştirildi: {FILTER_NAMES[scanner.filter_type]}")
             
     # Temizlik işlemleri
+    pipe.stop()  # Yakalama ve işleme iş parçacıklarını durdur
+    if recorder is not None:
+        recorder.close()  # Kaydedilmemiş çekimi sil, yazıcıyı bitir
+    else:
+        video_frames.close()  # Taşma dosyasını sil
+    if journal is not None:
+        journal.close()
+    if http is not None:
+        http.close()
     cap.release()  # Kamera kaynağını serbest bırak
     cv2.destroyAllWindows()  # Tüm açık pencereleri kapat
 
-def save_video(frames, width, height):
+def render_offline(input_path, output_path, direction='1', filter_type=0, scan_speed=2,
+                   stop_on_complete=False, verbose=True, threaded=False, metrics=None, sweep_seconds=None,
+                   encoder='opencv', codec=None):
+    """Bir video dosyasını pencere açmadan ve soru sormadan işler (headless mod)
+    
+    Kamera ve ekran olmayan sunucularda toplu işleme için kullanılır. Her kare
+    etkileşimli moddaki ile aynı tarama/filtre birleştirmesinden geçer ve
+    mümkün olan en yüksek hızda çıktı dosyasına yazılır.
+    
+    Parametreler:
+    input_path -- İşlenecek video dosyası veya kare günlüğü (.twj)
+    output_path -- Çıktı video dosyası (XVID/AVI)
+    direction -- Tarama yönü ('1', '2' veya '3')
+    filter_type -- Uygulanacak filtre tipi (0-5 arası değer)
+    scan_speed -- Tarama hızı (piksel/kare)
+    stop_on_complete -- Tarama tamamlanınca (çift yönlüde iki eksen de) kalan kareleri işlemeden bitir
+    verbose -- İş sonunda FPS raporu yazılsın mı?
+    threaded -- Çözme, işleme ve kodlama ayrı iş parçacıklarında mı çalışsın?
+                (dosya kaynağında hiçbir kare atılmaz, çıktı aynıdır)
+    metrics -- Aşama sürelerinin kaydedileceği StageMetrics (None ise ölçüm yapılmaz)
+    sweep_seconds -- Verilirse tarama videonun zaman damgalarıyla ilerler:
+                     bir eksenin taranma süresi (saniye)
+    encoder -- Çıktı kodlayıcısı ('opencv' veya 'ffmpeg')
+    codec -- Kodlayıcı codec'i (None ise kodlayıcının varsayılanı)
+    
+    Dönüş:
+    İşlenen kare sayısı, süre ve FPS bilgisini içeren sözlük (giriş açılamazsa None)
+    """
+    metrics = metrics or NULL_METRICS
+    cap, _ = open_source(input_path)
+    if not cap.isOpened():
+        print(f"Video açılamadı: {input_path}")
+        return None
+    
+    # Girişin FPS değeri bilinmiyorsa kayıttaki varsayılan 20 FPS kullanılır
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    if not fps or fps <= 0:
+        fps = 20.0
+    
+    writer = create_encoder(encoder, codec)
+    scanner = None
+    frame_count = 0
+    
+    def process(frame, current_result, timestamp):
+        nonlocal scanner
+        # İlk karede boyutlara göre efekt motorunu oluştur
+        if scanner is None:
+            height, width = frame.shape[:2]
+            scanner = TimeWarpScanner(width, height, direction, filter_type, scan_speed, sweep_seconds,
+                                      metrics=metrics)
+        return scanner.step(frame, current_result, timestamp)
+    
+    # Etkileşimli moddaki gibi ayna görüntüsü (flip) yakalama aşamasında yapılır
+    pipe = FramePipeline(cap, process, live=False, threaded=threaded, metrics=metrics)
+    start_time = time.perf_counter()
+    
+    for current_result, timestamp in pipe.frames():
+        # İlk karede boyutlara göre video yazıcıyı aç
+        if not writer.is_open:
+            height, width = current_result.shape[:2]
+            output_dir = os.path.dirname(output_path)
+            if output_dir and not os.path.exists(output_dir):
+                os.makedirs(output_dir)
+            writer.open(output_path, width, height, fps)
+        
+        with metrics.stage('kodlama'):
+            writer.write(current_result)
+        pipe.release(current_result)
+        metrics.frame()
+        frame_count += 1
+        
+        # Çift yönlü taramada iki eksen de bitmeden durma
+        if stop_on_complete and scanner.finished:
+            break
+    
+    pipe.stop()
+    elapsed = time.perf_counter() - start_time
+    cap.release()
+    writer.close()
+    
+    stats = {
+        'input': input_path,
+        'output': output_path,
+        'frames': frame_count,
+        'seconds': elapsed,
+        'fps': frame_count / elapsed if elapsed > 0 else 0.0,
+        'encode_fps': writer.throughput,
+    }
+    if verbose:
+        print(f"{input_path} -> {output_path}: {frame_count} kare, "
+              f"{elapsed:.2f} sn, {stats['fps']:.1f} FPS (kodlama {stats['encode_fps']:.0f} kare/sn)")
+    return stats
+
+def offline_output_path(input_path, output_dir, direction, filter_type, extension='.avi'):
+    """Headless işlemenin çıktı dosyası yolunu giriş adı ve ayarlardan oluşturur"""
+    name = os.path.splitext(os.path.basename(input_path))[0]
+    return os.path.join(output_dir, f"time_warp_{name}_d{direction}_f{filter_type}{extension}")
+
+def new_video_path(extension='.avi'):
+    """Kaydedilecek video için zaman damgalı dosya yolu oluşturur"""
+    # Dosya adı için zaman damgası oluştur
+    timestamp = time.strftime("%Y%m%d-%H%M%S")  # Yıl-ay-gün-saat-dakika-saniye formatında
+    return f"time_warp_videos/time_warp_{timestamp}{extension}"  # Dosya yolu
+
+def save_video(frames, width, height, fps=20.0, encoder='opencv', codec=None, index=None, direction=None,
+               filter_type=None):
     """Video karelerini bir dosyaya kaydeder
     
     Parametreler:
-    frames -- Kaydedilecek video kareleri listesi
-    width -- Görüntü genişliği
-    height -- Görüntü yüksekliği
+    frames -- Kaydedilecek video kareleri (liste veya FrameStore, sırayla okunur)
+    width -- Video genişliği
+    height -- Video yüksekliği (kareler farklı boyuttaysa bu boyuta ölçeklenir)
+    fps -- Video FPS değeri (kameranın ölçülen hızı verilirse video gerçek hızında oynar)
+    encoder -- Kodlayıcı ('opencv' veya 'ffmpeg')
+    codec -- Kodlayıcı codec'i (None ise kodlayıcının varsayılanı)
+    index -- Verilirse kaydedilen video bu RecordingIndex'e eklenir
+    direction -- Dizine yazılacak tarama yönü
+    filter_type -- Dizine yazılacak filtre
     """
     # Kaydedilecek kare yoksa uyarı ver ve fonksiyondan çık
     if not frames:
         print("Kaydedilecek kare bulunamadı!")
         return
-        
-    # Dosya adı için zaman damgası oluştur
-    timestamp = time.strftime("%Y%m%d-%H%M%S")  # Yıl-ay-gün-saat-dakika-saniye formatında
-    video_path = f"time_warp_videos/time_warp_{timestamp}.avi"  # Dosya yolu
     
     # Video yazıcıyı oluştur
-    fourcc = cv2.VideoWriter_fourcc(*'XVID')  # Video codec - XVID
-    out = cv2.VideoWriter(video_path, fourcc, 20.0, (width, height))  # 20 FPS, belirtilen boyutta
+    writer = create_encoder(encoder, codec)
+    video_path = new_video_path(writer.extension)
+    writer.open(video_path, width, height, fps)
     
     print(f"Video kaydediliyor: {video_path}")
     
     # Tüm kareleri videoya yaz
-    for frame in frames:
-        out.write(frame)  # Her kareyi dosyaya yaz
+    scaled = None  # Küçük boyutta işlenmiş kareler için ölçekleme tamponu
+    try:
+        for frame in frames:
+            if frame.shape[1::-1] != (width, height):
+                frame = scaled = cv2.resize(frame, (width, height), dst=scaled, interpolation=cv2.INTER_LINEAR)
+            writer.write(frame)  # Her kareyi dosyaya yaz
+    finally:
+        # Video yazıcıyı kapat
+        writer.close()  # Dosyayı kapat
+    print(f"Video başarıyla kaydedildi: {video_path} ({writer.frames} kare, {fps:.1f} FPS, "
+          f"kodlama {writer.throughput:.0f} kare/sn)")
+    if index is not None:
+        index.add(video_path, width, height, writer.frames, fps, direction, filter_type)
+
+def main(argv=None):
+    """Komut satırı giriş noktası
+    
+    Argüman verilmezse etkileşimli kamera modu başlar. --input verilirse video
+    dosyaları pencere açılmadan işlenir ve her iş için FPS raporu yazılır.
+    """
+    parser = argparse.ArgumentParser(description="Time Warp Scan efekti")
+    parser.add_argument('--input', nargs='+', help="Headless mod: işlenecek video dosyaları veya kare günlükleri")
+    parser.add_argument('--output', help="Tek giriş için çıktı dosyası veya çoklu giriş için klasör")
+    parser.add_argument('--direction', choices=['1', '2', '3'], default='1',
+                        help="Tarama yönü (1: Yukarıdan Aşağıya, 2: Soldan Sağa, 3: Çift Yönlü)")
+    parser.add_argument('--filter', type=int, choices=range(6), default=0, help="Filtre tipi (0-5)")
+    parser.add_argument('--scan-speed', type=int, default=2, help="Tarama hızı (piksel/kare)")
+    parser.add_argument('--sweep-seconds', type=float,
+                        help="Taramayı kare sayısı yerine zamanla ilerlet: bir eksenin taranma süresi (saniye)")
+    parser.add_argument('--stop-on-complete', action='store_true',
+                        help="Tarama tamamlanınca kalan kareleri işleme")
+    parser.add_argument('--record-mode', choices=['stream', 'memory'], default='stream',
+                        help="Kayıt modu: arka planda diske akıt veya 's' tuşuna kadar bellekte tut")
+    parser.add_argument('--drop-policy', choices=['block', 'drop_oldest', 'drop_newest'], default='block',
+                        help="Akış kaydında kuyruk dolunca davranış")
+    parser.add_argument('--queue-size', type=int, default=32, help="Akış kaydı kuyruk boyutu (kare)")
+    parser.add_argument('--ram-limit-mb', type=int, default=1024,
+                        help="Bellek kaydında RAM sınırı (MB), aşılırsa kareler diske taşar")
+    parser.add_argument('--source', default='0',
+                        help="Etkileşimli mod: kamera indeksi, video dosyası veya kare günlüğü (.twj)")
+    parser.add_argument('--journal', help="Etkileşimli mod: ham kamera karelerini bu kare günlüğüne (.twj) yaz")
+    parser.add_argument('--threaded', action='store_true',
+                        help="Yakalama, işleme ve gösterim/kodlama aşamalarını ayrı iş parçacıklarında çalıştır")
+    parser.add_argument('--encoder', choices=ENCODER_BACKENDS, default='opencv',
+                        help="Kayıt kodlayıcısı: cv2.VideoWriter veya boru üzerinden ffmpeg")
+    parser.add_argument('--codec', help="Kodlayıcı codec'i (opencv: FourCC, ör. XVID; ffmpeg: ör. libx264)")
+    parser.add_argument('--http', type=int, metavar='PORT',
+                        help="Etkileşimli mod: görüntüyü bu porttan MJPEG olarak da yayınla (tarayıcıyla izlemek için)")
+    parser.add_argument('--http-host', default='127.0.0.1',
+                        help="MJPEG yayınının dinleyeceği adres (başka makinelerden izlemek için 0.0.0.0)")
+    parser.add_argument('--process-scale', type=float, default=1.0,
+                        help="Etkileşimli mod: efektin hesaplanıp önizlendiği çözünürlüğün kamera "
+                             "çözünürlüğüne oranı (ör. 0.5 zayıf cihazlarda akıcı önizleme sağlar)")
+    parser.add_argument('--record-scale', type=float, default=1.0,
+                        help="Etkileşimli mod: kaydedilen videonun kamera çözünürlüğüne oranı "
+                             "(varsayılan tam çözünürlük); yalnızca çıktı boyutunu değiştirir, "
+                             "kareler --process-scale boyutundan büyütüldüğü için ayrıntı artmaz")
+    parser.add_argument('--metrics', action='store_true', help="Aşama sürelerini ölç ve çıkışta özetle")
+    parser.add_argument('--hud', action='store_true', help="Aşama sürelerini ekranda göster (--metrics içerir)")
+    parser.add_argument('--metrics-out', help="Aşama ölçümlerinin kaydedileceği .json veya .csv dosyası")
+    args = parser.parse_args(argv)
+    if args.process_scale <= 0 or args.record_scale <= 0:
+        parser.error("--process-scale ve --record-scale pozitif olmalı")
+    
+    if args.encoder == 'ffmpeg' and not FFmpegEncoder.available():
+        print("ffmpeg bulunamadı! Kurun veya --encoder opencv kullanın.")
+        return
+    
+    metrics = StageMetrics() if args.metrics or args.hud or args.metrics_out else None
+    
+    if not args.input:
+        # Time Warp Scan fonksiyonunu çağır
+        time_warp_scan(args.record_mode, args.drop_policy, args.queue_size, args.ram_limit_mb,
+                       args.source, args.threaded, metrics, args.hud, args.sweep_seconds,
+                       args.encoder, args.codec, args.journal, args.http, args.http_host,
+                       args.process_scale, args.record_scale)
+        report_metrics(metrics, args.metrics_out)
+        return
+    
+    total_frames = 0
+    total_seconds = 0.0
+    for input_path in args.input:
+        # Çıktı yolu: tek girişte doğrudan --output, aksi halde klasör içinde girişle aynı ad
+        if args.output and len(args.input) == 1 and not os.path.isdir(args.output):
+            output_path = args.output
+        else:
+            output_path = offline_output_path(input_path, args.output or 'time_warp_videos',
+                                              args.direction, args.filter, encoder_extension(args.encoder))
+        
+        stats = render_offline(input_path, output_path, args.direction, args.filter,
+                               args.scan_speed, args.stop_on_complete, threaded=args.threaded,
+                               metrics=metrics, sweep_seconds=args.sweep_seconds,
+                               encoder=args.encoder, codec=args.codec)
+        if stats:
+            total_frames += stats['frames']
+            total_seconds += stats['seconds']
     
-    # Video yazıcıyı kapat
-    out.release()  # Dosyayı kapat
-    print(f"Video başarıyla kaydedildi: {video_path}")
+    if len(args.input) > 1 and total_seconds > 0:
+        print(f"Toplam: {total_frames} kare, {total_seconds:.2f} sn, "
+              f"{total_frames / total_seconds:.1f} FPS")
+    report_metrics(metrics, args.metrics_out)
 
 # Ana program başlangıcı
 if __name__ == "__main__":
-    time_warp_scan()  # Time Warp Scan fonksiyonunu çağır
+    main()
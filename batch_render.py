@@ -0,0 +1,174 @@
+import argparse
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+
+from aliolkac_tiktok_filtre import offline_output_path, render_offline
+from encoders import ENCODER_BACKENDS, FFmpegEncoder, encoder_extension
+
+
+# Çıktının hangi ayarlarla işlendiği <çıktı>.render.json dosyasında tutulur
+SETTINGS_SUFFIX = '.render.json'
+
+
+def settings_path(output_path):
+    return output_path + SETTINGS_SUFFIX
+
+
+def render_settings(direction, filter_type, scan_speed, sweep_seconds, encoder, codec):
+    """Çıktıyı belirleyen işleme ayarları (ayar dosyasına yazılır ve onunla karşılaştırılır)"""
+    return {'direction': direction, 'filter': filter_type, 'scan_speed': scan_speed,
+            'sweep_seconds': sweep_seconds, 'encoder': encoder, 'codec': codec}
+
+
+def is_up_to_date(input_path, output_path, settings=None):
+    """Çıktı dosyası var, girişten daha yeni ve aynı ayarlarla işlenmişse True döndürür
+
+    settings verilirse çıktının ayar dosyasındaki ayarlarla aynı olmalıdır;
+    ayar dosyası yoksa veya okunamıyorsa çıktı güncel sayılmaz.
+    """
+    if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
+        return False
+    if os.path.getmtime(output_path) < os.path.getmtime(input_path):
+        return False
+    if settings is None:
+        return True
+    try:
+        with open(settings_path(output_path), encoding='utf-8') as f:
+            return json.load(f) == settings
+    except (OSError, ValueError):
+        return False
+
+
+def _temp_path(path):
+    # Aynı klasörde, noktayla başlayan geçici ad (os.replace aynı dosya sisteminde atomiktir)
+    directory, name = os.path.split(path)
+    return os.path.join(directory, '.' + name)
+
+
+def _init_worker():
+    # Her işlem kendi çekirdeğini kullanır; OpenCV'nin iç iş parçacıkları
+    # çekirdek sayısı kadar işlemle birlikte aşırı yüklemeye yol açar
+    cv2.setNumThreads(1)
+
+
+def _render_job(input_path, output_path, direction, filter_type, scan_speed, sweep_seconds, encoder, codec):
+    # Yarıda kalan işleme son çıktı adında güncel görünen bir dosya bırakmasın diye
+    # geçici dosyaya yazılır ve yalnızca başarıyla bitince yerine taşınır
+    temp_path = _temp_path(output_path)
+    try:
+        stats = render_offline(input_path, temp_path, direction, filter_type, scan_speed, verbose=False,
+                               sweep_seconds=sweep_seconds, encoder=encoder, codec=codec)
+        if stats is None or not os.path.exists(temp_path):
+            return None
+        os.replace(temp_path, output_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    # Ayar dosyası videodan sonra yazılır: arada kesilirse eski ayarlar uymaz ve dosya yeniden işlenir
+    settings = render_settings(direction, filter_type, scan_speed, sweep_seconds, encoder, codec)
+    temp_settings = _temp_path(settings_path(output_path))
+    with open(temp_settings, 'w', encoding='utf-8') as f:
+        json.dump(settings, f)
+    os.replace(temp_settings, settings_path(output_path))
+    return stats
+
+
+def batch_render(input_dir='time_warp_videos', output_dir=None, direction='1', filter_type=0,
+                 scan_speed=2, workers=None, force=False, pattern='*.avi', sweep_seconds=None,
+                 encoder='opencv', codec=None):
+    """Bir klasördeki videoları işlem havuzunda yeniden işler
+
+    Dosyalar ProcessPoolExecutor ile çekirdek başına bir işçiye dağıtılır.
+    Çıktısı girişten yeni olan ve aynı ayarlarla (yön, filtre, tarama hızı,
+    süre, kodlayıcı, codec) işlenmiş dosyalar (force verilmedikçe) atlanır.
+    Çıktılar geçici dosyaya yazılıp başarıyla bitince yerine taşınır.
+
+    Parametreler:
+    input_dir -- Giriş videolarının bulunduğu klasör
+    output_dir -- Çıktı klasörü (None ise input_dir/rendered)
+    direction -- Tarama yönü ('1', '2' veya '3')
+    filter_type -- Uygulanacak filtre tipi (0-5 arası değer)
+    scan_speed -- Tarama hızı (piksel/kare)
+    workers -- İşçi işlem sayısı (None ise çekirdek sayısı)
+    force -- Güncel çıktıları da yeniden işle
+    pattern -- Giriş dosyası deseni
+    sweep_seconds -- Verilirse tarama zaman damgalarıyla ilerler (bir eksenin taranma süresi)
+    encoder -- Çıktı kodlayıcısı ('opencv' veya 'ffmpeg')
+    codec -- Kodlayıcı codec'i (None ise kodlayıcının varsayılanı)
+
+    Dönüş:
+    Her işlenen dosya için render_offline istatistiklerinin listesi
+    """
+    output_dir = output_dir or os.path.join(input_dir, 'rendered')
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+
+    settings = render_settings(direction, filter_type, scan_speed, sweep_seconds, encoder, codec)
+    jobs = []
+    skipped = 0
+    for input_path in sorted(glob.glob(os.path.join(input_dir, pattern))):
+        output_path = offline_output_path(input_path, output_dir, direction, filter_type,
+                                          encoder_extension(encoder))
+        if not force and is_up_to_date(input_path, output_path, settings):
+            skipped += 1
+            continue
+        jobs.append((input_path, output_path))
+
+    print(f"{len(jobs)} dosya işlenecek, {skipped} güncel dosya atlandı ({workers} işçi)")
+    results = []
+    start_time = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = {pool.submit(_render_job, input_path, output_path, direction, filter_type,
+                               scan_speed, sweep_seconds, encoder, codec): input_path
+                   for input_path, output_path in jobs}
+        for future in as_completed(futures):
+            input_path = futures[future]
+            try:
+                stats = future.result()
+            except Exception as e:
+                print(f"{input_path}: hata - {e}")
+                continue
+            if stats is None:
+                continue
+            results.append(stats)
+            print(f"{input_path}: {stats['frames']} kare, {stats['seconds']:.2f} sn, {stats['fps']:.1f} FPS")
+    elapsed = time.perf_counter() - start_time
+
+    total_frames = sum(stats['frames'] for stats in results)
+    if results and elapsed > 0:
+        print(f"Toplam: {len(results)} dosya, {total_frames} kare, {elapsed:.2f} sn, "
+              f"{total_frames / elapsed:.1f} FPS (toplam), "
+              f"{sum(stats['fps'] for stats in results) / len(results):.1f} FPS (dosya başına ortalama)")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kayıt klasörünü işlem havuzunda yeniden işler")
+    parser.add_argument('input_dir', nargs='?', default='time_warp_videos', help="Giriş klasörü")
+    parser.add_argument('--output-dir', help="Çıktı klasörü (varsayılan: <giriş>/rendered)")
+    parser.add_argument('--direction', choices=['1', '2', '3'], default='1', help="Tarama yönü")
+    parser.add_argument('--filter', type=int, choices=range(6), default=0, help="Filtre tipi (0-5)")
+    parser.add_argument('--scan-speed', type=int, default=2, help="Tarama hızı (piksel/kare)")
+    parser.add_argument('--sweep-seconds', type=float, help="Taramayı zamanla ilerlet: bir eksenin taranma süresi (saniye)")
+    parser.add_argument('--encoder', choices=ENCODER_BACKENDS, default='opencv', help="Çıktı kodlayıcısı")
+    parser.add_argument('--codec', help="Kodlayıcı codec'i")
+    parser.add_argument('--workers', type=int, help="İşçi sayısı (varsayılan: çekirdek sayısı)")
+    parser.add_argument('--force', action='store_true', help="Güncel çıktıları da yeniden işle")
+    parser.add_argument('--pattern', default='*.avi', help="Giriş dosyası deseni")
+    args = parser.parse_args(argv)
+    if args.encoder == 'ffmpeg' and not FFmpegEncoder.available():
+        print("ffmpeg bulunamadı! Kurun veya --encoder opencv kullanın.")
+        return
+
+    batch_render(args.input_dir, args.output_dir, args.direction, args.filter,
+                 args.scan_speed, args.workers, args.force, args.pattern, args.sweep_seconds,
+                 args.encoder, args.codec)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,477 @@
+import argparse
+import json
+import os
+import platform
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from filters import apply_filter, FILTER_NAMES
+
+# Ölçüm takımının çözünürlükleri
+RESOLUTIONS = {
+    '480p': (640, 480),
+    '720p': (1280, 720),
+    '1080p': (1920, 1080),
+    '4k': (3840, 2160),
+}
+SUITES = ('filters', 'scan', 'mirror')
+
+
+def legacy_apply_filter(frame, filter_type):
+    """Filtre motorundan önceki if/elif apply_filter uygulaması (karşılaştırma için)"""
+    if frame is None or frame.size == 0 or frame.shape[0] == 0 or frame.shape[1] == 0:
+        return frame
+    if filter_type == 0:
+        return frame
+    elif filter_type == 1:
+        return cv2.cvtColor(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), cv2.COLOR_GRAY2BGR)
+    elif filter_type == 2:
+        return 255 - frame
+    elif filter_type == 3:
+        sepya = np.array([[0.272, 0.534, 0.131],
+                          [0.349, 0.686, 0.168],
+                          [0.393, 0.769, 0.189]])
+        return cv2.transform(frame, sepya)
+    elif filter_type == 4:
+        edges = cv2.Canny(frame, 100, 200)
+        return cv2.cvtColor(edges, cv2.COLOR_GRAY2BGR)
+    elif filter_type == 5:
+        h, w = frame.shape[:2]
+        new_w = max(1, w//10)
+        new_h = max(1, h//10)
+        if new_w < w and new_h < h:
+            temp = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+            return cv2.resize(temp, (w, h), interpolation=cv2.INTER_NEAREST)
+        else:
+            return frame
+    return frame
+
+
+def synthetic_frame(width, height, seed=0):
+    """Kamera gerektirmeyen, tekrarlanabilir test karesi üretir
+
+    Düz gürültü yerine yumuşak geçişler ve keskin kenarlar içerir, böylece
+    kenar algılama gibi filtreler gerçekçi miktarda iş yapar.
+    """
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 4 * np.pi, width, dtype=np.float32)
+    y = np.linspace(0, 3 * np.pi, height, dtype=np.float32)
+    base = (np.sin(x)[None, :] * np.cos(y)[:, None] + 1.0) * 127.5
+    frame = np.empty((height, width, 3), np.uint8)
+    for c in range(3):
+        frame[..., c] = np.clip(base * (0.6 + 0.2 * c) + rng.normal(0, 12, (height, width)), 0, 255)
+    for _ in range(12):
+        x0, y0 = int(rng.integers(0, width)), int(rng.integers(0, height))
+        color = tuple(int(v) for v in rng.integers(0, 256, 3))
+        cv2.rectangle(frame, (x0, y0), (x0 + width // 8, y0 + height // 8), color, -1)
+    return frame
+
+
+def time_call(fn, repeat):
+    """fn fonksiyonunu repeat kez çalıştırıp çağrı başına süreyi (mikrosaniye) döndürür"""
+    fn()  # Isınma - ilk çağrıdaki tampon ayırma ölçüme girmesin
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def benchmark_filters(width=640, height=480, band=2, repeat=500):
+    """Eski if/elif apply_filter ile filtre motorunu çağrı başına karşılaştırır
+
+    Her filtre tam karede ve taramanın kullandığı band boyutlarında (band
+    piksel yüksekliğinde satır ve band piksel genişliğinde sütun) ölçülür.
+    Eski uygulamanın süresine, taramada olduğu gibi sonucun hedef tampona
+    kopyalanması da dahildir. Ölçümden önce iki uygulamanın çıktılarının bit
+    bit aynı olduğu doğrulanır.
+
+    Bölge sütunu taramanın gerçekte kullandığı, bandı kare bağlamında
+    (halo ile) filtreleyen çağrının süresidir; sonucu bütün kareyi filtreleyip
+    bandı kesmekle karşılaştırılır.
+
+    Dönüş:
+    Her ölçüm için sözlüklerden oluşan liste
+    """
+    frame = synthetic_frame(width, height)
+    shapes = {
+        'kare': (slice(None), slice(None)),
+        'satir': (slice(height // 2, height // 2 + band), slice(None)),
+        'sutun': (slice(None), slice(width // 2, width // 2 + band)),
+    }
+    rows = []
+    for filter_type, name in enumerate(FILTER_NAMES):
+        full = legacy_apply_filter(frame, filter_type)
+        for shape_name, index in shapes.items():
+            src = frame[index]
+            out = np.empty_like(src)
+            expected = legacy_apply_filter(src, filter_type)
+            if not np.array_equal(apply_filter(src, filter_type, out=out), expected):
+                raise AssertionError(f"{name} ({shape_name}) eski uygulamayla aynı sonucu vermiyor")
+            region = apply_filter(frame, filter_type, out=out.copy(), region=index)
+            region_exact = bool(np.array_equal(region, full[index]))
+
+            # Eski taramadaki gibi sonuç, ayrı bir adımda hedef tampona kopyalanır
+            def legacy():
+                out[...] = legacy_apply_filter(src, filter_type)
+            legacy_us = time_call(legacy, repeat)
+            engine_us = time_call(lambda: apply_filter(src, filter_type, out=out), repeat)
+            region_us = time_call(lambda: apply_filter(frame, filter_type, out=out, region=index), repeat)
+            rows.append({
+                'filter': filter_type,
+                'name': name,
+                'shape': shape_name,
+                'size': f"{src.shape[1]}x{src.shape[0]}",
+                'legacy_us': legacy_us,
+                'engine_us': engine_us,
+                'speedup': legacy_us / engine_us if engine_us > 0 else 0.0,
+                'region_us': region_us,
+                'region_exact': region_exact,
+            })
+    return rows
+
+
+def measure(step, frames, alloc_frames=10):
+    """step(i) fonksiyonunu kare kare ölçer
+
+    Önce frames kare süre ölçülür, ardından tracemalloc açıkken alloc_frames
+    kare daha çalıştırılıp kare başına ayrılan bellek bulunur. tracemalloc
+    yavaşlattığı için süre ölçümüne karışmaz. NumPy dizi ayırmaları
+    tracemalloc'a bildirildiği için büyük tamponlar da sayılır.
+
+    Dönüş:
+    fps, p50/p99/ortalama kare süresi (ms) ve kare başına ayrılan bayt
+    """
+    step(0)  # Isınma - önbellekler ve tamponlar bu karede hazırlanır
+    times = np.empty(frames)
+    for i in range(frames):
+        start = time.perf_counter()
+        step(i + 1)
+        times[i] = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        allocated = 0
+        for i in range(alloc_frames):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            step(frames + 1 + i)
+            allocated += tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'frames': frames,
+        'fps': frames / times.sum() if times.sum() > 0 else 0.0,
+        'p50_ms': float(np.percentile(times, 50) * 1000),
+        'p99_ms': float(np.percentile(times, 99) * 1000),
+        'mean_ms': float(times.mean() * 1000),
+        'alloc_bytes_per_frame': allocated / alloc_frames if alloc_frames else 0.0,
+    }
+
+
+def synthetic_frames(width, height, count=4):
+    """Sırayla beslenecek birkaç farklı sentetik kare (önbellek etkisini azaltmak için)"""
+    return [synthetic_frame(width, height, seed) for seed in range(count)]
+
+
+def filter_cases(frames):
+    """Her apply_filter tipi için tam kare ölçüm adımları"""
+    out = np.empty_like(frames[0])
+    for filter_type, name in enumerate(FILTER_NAMES):
+        def step(i, filter_type=filter_type):
+            apply_filter(frames[i % len(frames)], filter_type, out=out)
+        yield name, step
+
+
+def scan_cases(frames, filter_type=1, scan_speed=2):
+    """Her tarama yönü için time_warp_scan'in kare başına işini yapan ölçüm adımları
+
+    Etkileşimli döngüdeki gibi her karede TimeWarpScanner.step() çalıştırılır
+    (sonuç kopyası + tarama). Tarama tamamlanınca motor sıfırlanır, böylece
+    ölçüm hep tarama çizgisi ilerlerken yapılır.
+    """
+    from scanner import TimeWarpScanner
+
+    height, width = frames[0].shape[:2]
+    for direction in ('1', '2', '3'):
+        scanner = TimeWarpScanner(width, height, direction, filter_type, scan_speed)
+        out = np.empty_like(frames[0])
+
+        def step(i, scanner=scanner, out=out):
+            if scanner.finished:
+                scanner.reset()
+            scanner.step(frames[i % len(frames)], out)
+        yield f"yön {direction}", step
+
+
+def mirror_cases(frames, stripes=1):
+    """Dışbükey ayna ve büyüteç modları için ölçüm adımları"""
+    from disbukey import MirrorRenderer
+
+    h, w = frames[0].shape[:2]
+    renderer = MirrorRenderer(w, h, stripes=stripes)
+    out = np.empty_like(frames[0])
+    # Büyüteç aynanın içinde, merkezden biraz uzakta basılı tutuluyor
+    px, py = w // 2 + renderer.circle_radius // 3, h // 2 - renderer.circle_radius // 4
+    try:
+        for name, pressed in (('dışbükey', False), ('büyüteç', True)):
+            def step(i, pressed=pressed):
+                renderer.render(frames[i % len(frames)], out, pressed, px, py)
+            yield name, step
+    finally:
+        renderer.close()
+
+
+class LoopSource:
+    """Sentetik kareleri sırayla döndüren, dosya kaynağı gibi davranan kaynak
+
+    Çoklu akış ölçümünde cv2.VideoCapture yerine kullanılır; kod çözme
+    maliyeti olmadığından ölçüm yalnızca efektleri ve zamanlamayı kapsar.
+    """
+
+    def __init__(self, frames, count, fps=30.0):
+        self.frames = frames
+        self.count = count
+        self.fps = fps
+        self.position = 0
+
+    def isOpened(self):
+        return True
+
+    def read(self, image=None):
+        if self.position >= self.count:
+            return False, None
+        frame = self.frames[self.position % len(self.frames)]
+        self.position += 1
+        return True, frame
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_POS_MSEC:
+            return (self.position - 1) / self.fps * 1000.0
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        return 0.0
+
+    def release(self):
+        pass
+
+
+def benchmark_streams(resolution='480p', counts=(1, 2, 4, 8), frames=200, effect='scan', workers=None,
+                      verbose=True):
+    """Çoklu akış çalıştırıcısının toplam hızını akış sayısına göre ölçer
+
+    Her akış sayısı için o kadar sentetik akış tek süreçte, ortak işçi
+    havuzuyla sonuna kadar (akış başına frames kare) işlenir. effect 'mixed'
+    ise akışlar sırayla tarama ve ayna olur. Ölçeklenme oranı tek akışlı
+    ölçüme göredir; akış başına en düşük ve en yüksek FPS zamanlamanın
+    adaletini gösterir.
+
+    Dönüş:
+    Ölçüm sözlüklerinin listesi (compare ile karşılaştırılabilir)
+    """
+    from multistream import MultiStreamRunner, StreamSession
+
+    width, height = RESOLUTIONS[resolution]
+    frame_set = synthetic_frames(width, height)
+    rows = []
+    for count in counts:
+        sessions = []
+        for i in range(count):
+            kind = effect if effect != 'mixed' else ('scan', 'mirror')[i % 2]
+            sessions.append(StreamSession(f"{i}_{kind}", LoopSource(frame_set, frames), kind, filter_type=1))
+        summary = MultiStreamRunner(sessions, workers).run()
+        per_stream = [s['fps'] for s in summary['per_stream'].values()]
+        row = {
+            'suite': 'streams',
+            'name': f"{effect} x{count}",
+            'resolution': resolution,
+            'streams': count,
+            'workers': summary['workers'],
+            'fps': summary['fps'],
+            'min_stream_fps': min(per_stream),
+            'max_stream_fps': max(per_stream),
+        }
+        row['scaling'] = row['fps'] / rows[0]['fps'] if rows else 1.0
+        rows.append(row)
+        if verbose:
+            print_streams_row(row)
+    return rows
+
+
+def run_suite(resolutions=tuple(RESOLUTIONS), suites=SUITES, frames=100, stripes=1, verbose=True):
+    """Filtreleri, tarama yönlerini ve ayna modlarını sentetik karelerle ölçer
+
+    Kamera gerektirmez. Her ölçüm için measure() sonucuna takım, ad ve
+    çözünürlük eklenir.
+
+    Dönüş:
+    Ölçüm sözlüklerinin listesi
+    """
+    case_factories = {
+        'filters': filter_cases,
+        'scan': scan_cases,
+        'mirror': lambda f: mirror_cases(f, stripes),
+    }
+    rows = []
+    for resolution in resolutions:
+        width, height = RESOLUTIONS[resolution]
+        frame_set = synthetic_frames(width, height)
+        for suite in suites:
+            for name, step in case_factories[suite](frame_set):
+                row = {'suite': suite, 'name': name, 'resolution': resolution}
+                row.update(measure(step, frames))
+                rows.append(row)
+                if verbose:
+                    print_suite_row(row)
+    return rows
+
+
+def allocation_failures(rows, limit_kb):
+    """Kare başına limit_kb'den fazla bellek ayıran ölçümleri döndürür
+
+    Kare döngüleri tamponlarını önceden ayırır; kare başına yalnızca NumPy
+    görünümleri gibi küçük Python nesneleri oluşur. Sınırı aşan ölçüm (ör.
+    büyüteçte yayınlama için NumPy'nin ayırdığı ara tampon) bu iddiayı bozar.
+    """
+    return [row for row in rows if row['alloc_bytes_per_frame'] > limit_kb * 1024]
+
+
+def environment_info():
+    """Sonuçların hangi ortamda alındığını kaydetmek için sürüm bilgileri"""
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'opencv': cv2.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'opencv_threads': cv2.getNumThreads(),
+        'time': time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def save_results(path, rows, settings):
+    """Ölçümleri ortam bilgisi ve ayarlarla birlikte JSON olarak kaydeder"""
+    data = {'environment': environment_info(), 'settings': settings, 'results': rows}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare_results(baseline, current):
+    """İki JSON sonucunu aynı (takım, ad, çözünürlük) ölçümleri üzerinden karşılaştırır
+
+    Dönüş:
+    (anahtar, eski fps, yeni fps, oran) listesi
+    """
+    def index(data):
+        return {(r['suite'], r['name'], r['resolution']): r for r in data['results']}
+
+    old, new = index(baseline), index(current)
+    rows = []
+    for key, row in new.items():
+        if key in old:
+            old_fps = old[key]['fps']
+            rows.append((key, old_fps, row['fps'], row['fps'] / old_fps if old_fps > 0 else 0.0))
+    return rows
+
+
+def print_suite_header():
+    print(f"{'Takım':<9}{'Ölçüm':<16}{'Çözünürlük':<12}{'FPS':>9}{'p50 (ms)':>10}{'p99 (ms)':>10}{'Bellek/kare':>13}")
+
+
+def print_suite_row(row):
+    print(f"{row['suite']:<9}{row['name']:<16}{row['resolution']:<12}{row['fps']:>9.1f}"
+          f"{row['p50_ms']:>10.2f}{row['p99_ms']:>10.2f}{row['alloc_bytes_per_frame'] / 1024:>10.1f} KB")
+
+
+def print_streams_header():
+    print(f"{'Akış':>5}{'İşçi':>6}{'Toplam FPS':>12}{'Ölçeklenme':>12}{'En düşük':>10}{'En yüksek':>11}")
+
+
+def print_streams_row(row):
+    print(f"{row['streams']:>5}{row['workers']:>6}{row['fps']:>12.1f}{row['scaling']:>11.2f}x"
+          f"{row['min_stream_fps']:>10.1f}{row['max_stream_fps']:>11.1f}")
+
+
+def print_filter_table(rows):
+    print(f"{'Filtre':<16}{'Boyut':<14}{'Eski (us)':>11}{'Motor (us)':>12}{'Hızlanma':>10}"
+          f"{'Bölge (us)':>12}  Tam kareyle aynı")
+    for row in rows:
+        print(f"{row['name']:<16}{row['shape'] + ' ' + row['size']:<14}"
+              f"{row['legacy_us']:>11.1f}{row['engine_us']:>12.1f}{row['speedup']:>9.2f}x"
+              f"{row['region_us']:>12.1f}  {'evet' if row['region_exact'] else 'hayır'}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Efekt performans ölçümleri (kamera gerektirmez)")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('filters', help="apply_filter mikro ölçümü: eski uygulama ve filtre motoru")
+    p.add_argument('--width', type=int, default=640)
+    p.add_argument('--height', type=int, default=480)
+    p.add_argument('--band', type=int, default=2, help="Tarama bandı kalınlığı (piksel)")
+    p.add_argument('--repeat', type=int, default=500)
+
+    p = sub.add_parser('suite', help="Filtre, tarama yönü ve ayna modlarını çözünürlüklere göre ölç")
+    p.add_argument('--resolutions', nargs='+', choices=list(RESOLUTIONS), default=list(RESOLUTIONS))
+    p.add_argument('--suites', nargs='+', choices=SUITES, default=list(SUITES))
+    p.add_argument('--frames', type=int, default=100, help="Ölçüm başına kare sayısı")
+    p.add_argument('--stripes', default='1', help="Ayna için şerit sayısı veya 'auto'")
+    p.add_argument('--json', help="Sonuçların kaydedileceği JSON dosyası")
+    p.add_argument('--max-alloc', type=float, metavar='KB',
+                   help="Kare başına bundan fazla bellek ayıran ölçüm varsa hata koduyla çık")
+
+    p = sub.add_parser('streams', help="Çoklu akış çalıştırıcısının toplam hızını akış sayısına göre ölç")
+    p.add_argument('--resolution', choices=list(RESOLUTIONS), default='480p')
+    p.add_argument('--streams', nargs='+', type=int, default=[1, 2, 4, 8], help="Denenecek akış sayıları")
+    p.add_argument('--frames', type=int, default=200, help="Akış başına kare sayısı")
+    p.add_argument('--effect', choices=['scan', 'mirror', 'mixed'], default='scan')
+    p.add_argument('--workers', type=int, help="Ortak işçi sayısı (varsayılan: CPU sayısı)")
+    p.add_argument('--json', help="Sonuçların kaydedileceği JSON dosyası")
+
+    p = sub.add_parser('compare', help="İki JSON sonucunu karşılaştır")
+    p.add_argument('baseline', help="Önceki çalıştırmanın JSON dosyası")
+    p.add_argument('current', help="Yeni çalıştırmanın JSON dosyası")
+    args = parser.parse_args(argv)
+
+    if args.command == 'filters':
+        print_filter_table(benchmark_filters(args.width, args.height, args.band, args.repeat))
+    elif args.command == 'suite':
+        stripes = args.stripes if args.stripes == 'auto' else int(args.stripes)
+        print_suite_header()
+        rows = run_suite(args.resolutions, args.suites, args.frames, stripes)
+        if args.json:
+            settings = {'resolutions': args.resolutions, 'suites': args.suites,
+                        'frames': args.frames, 'stripes': args.stripes}
+            save_results(args.json, rows, settings)
+            print(f"Sonuçlar kaydedildi: {args.json}")
+        if args.max_alloc is not None:
+            failures = allocation_failures(rows, args.max_alloc)
+            for row in failures:
+                print(f"Bellek sınırı aşıldı: {row['suite']} / {row['name']} / {row['resolution']} "
+                      f"({row['alloc_bytes_per_frame'] / 1024:.1f} KB/kare > {args.max_alloc:g} KB)")
+            if failures:
+                raise SystemExit(1)
+    elif args.command == 'streams':
+        print_streams_header()
+        rows = benchmark_streams(args.resolution, args.streams, args.frames, args.effect, args.workers)
+        if args.json:
+            settings = {'resolution': args.resolution, 'streams': args.streams, 'frames': args.frames,
+                        'effect': args.effect, 'workers': args.workers}
+            save_results(args.json, rows, settings)
+            print(f"Sonuçlar kaydedildi: {args.json}")
+    elif args.command == 'compare':
+        print(f"{'Ölçüm':<40}{'Eski FPS':>10}{'Yeni FPS':>10}{'Oran':>8}")
+        for (suite, name, resolution), old_fps, new_fps, ratio in compare_results(
+                load_results(args.baseline), load_results(args.current)):
+            print(f"{suite + ' / ' + name + ' / ' + resolution:<40}{old_fps:>10.1f}{new_fps:>10.1f}{ratio:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,34 @@
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import cv2
 import numpy as np
 
+from metrics import NULL_METRICS, StageMetrics, report_metrics
+from mjpeg import MJPEGServer
+from pipeline import FramePipeline, open_journal, open_source, scaled_size
+
 # Dışbükey ayna parametreleri
 distortion_strength = 0.5 # Dışbükey etki gücü (0.3-0.5 arası iyi çalışır)
 
-# Kamera aç
-cap = cv2.VideoCapture(0)
-if not cap.isOpened():
-    print("Kamera açılamadı!")
-    exit()
-
 # Global değişkenler
 mouse_pressed = False
 press_x, press_y = 0, 0
 concave_radius = 50  # Efekt yarıçapı
 magnification = 1.2  # Büyütme faktörü artırıldı
+# Büyüteç hesabının yapıldığı pencerenin yarı genişliği (concave_radius katı).
+# Gaussian etki 4 yarıçap ötede 0.1 pikselin altına iner; 3 yarıçapta hâlâ ~2 pikseldir.
+magnifier_extent = 4.0
+# Otomatik şerit ayarında her aday için ölçülen kare sayısı
+stripe_tune_frames = 5
+
+# Ayna renkleri
+orange = (0, 128, 255)  # BGR formatta turuncu
+black = (0, 0, 0)       # BGR formatta siyah
+
+window_name = "Disbukey Trafik Aynasi"
 
 # Mouse callback fonksiyonu
 def mouse_callback(event, x, y, flags, param):
@@ -25,126 +39,513 @@ def mouse_callback(event, x, y, flags, param):
     elif event == cv2.EVENT_LBUTTONUP:
         mouse_pressed = False
 
-# Pencere oluştur ve mouse callback'i ekle
-window_name = "Disbukey Trafik Aynasi"
-cv2.namedWindow(window_name)
-cv2.setMouseCallback(window_name, mouse_callback)
-
-# Ekran boyutlarını al
-ret, frame = cap.read()
-if not ret:
-    print("Kamera görüntüsü alınamadı!")
-    exit()
-    
-h, w = frame.shape[:2]
-
-# Koordinat gridlerini önceden hesapla (performans için)
-x = np.arange(w, dtype=np.float32)
-y = np.arange(h, dtype=np.float32)
-xx, yy = np.meshgrid(x, y)
-
-# Maskeleri oluştur
-circle_radius = min(w, h) // 2 - 30
-center_x, center_y = w // 2, h // 2
+# Dışbükey harita önbelleği: (w, h, center_x, center_y, strength) -> (map1, map2)
+_convex_map_cache = {}
 
-# Ayna renkleri
-orange = (0, 128, 255)  # BGR formatta turuncu
-black = (0, 0, 0)       # BGR formatta siyah
+def convex_coordinates(map_x, map_y, center_x, center_y, strength, max_dist, tmp, tmp2):
+    """Ayna üzerindeki (map_x, map_y) noktalarını dışbükey kaynak koordinatlarına çevirir
+
+    Hesap yerinde yapılır: map_x/map_y girişte ayna koordinatlarını, çıkışta
+    kaynak karedeki koordinatları tutar. tmp ve tmp2 aynı boyutta float32 ara tamponlardır.
+    """
+    map_x -= center_x
+    map_y -= center_y
+
+    # Merkeze olan normalize edilmiş uzaklık
+    np.multiply(map_x, map_x, out=tmp)
+    np.multiply(map_y, map_y, out=tmp2)
+    tmp += tmp2
+    np.sqrt(tmp, out=tmp)
+    tmp *= strength / max_dist
+
+    # Dışbükey distorsiyon faktörü
+    np.arctan(tmp, out=tmp)
+    tmp *= 1.0 / (np.pi/2)
+    tmp += 1.0
+
+    # Yeni koordinatları hesapla
+    map_x /= tmp
+    map_x += center_x
+    map_y /= tmp
+    map_y += center_y
+
+def lens_view(buffer, rows, cols):
+    """Bitişik tamponun başından (rows, cols) boyutunda bitişik bir görünüm döndürür"""
+    return buffer.reshape(-1)[:rows * cols].reshape(rows, cols)
+
+def build_convex_maps(w, h, center_x, center_y, strength):
+    """Dışbükey ayna için float32 koordinat haritalarını hesaplar"""
+    # Koordinat gridleri
+    map_x, map_y = np.meshgrid(np.arange(w, dtype=np.float32), np.arange(h, dtype=np.float32))
+    max_dist = np.sqrt((w//2)**2 + (h//2)**2)
+    convex_coordinates(map_x, map_y, center_x, center_y, strength, max_dist,
+                       np.empty_like(map_x), np.empty_like(map_x))
+    return map_x, map_y
+
+def get_convex_maps(w, h, center_x, center_y, strength):
+    """Dışbükey haritaları sabit noktalı (CV_16SC2) biçimde önbellekten döndürür
+
+    Haritalar fare basılı değilken yalnızca boyut, merkez ve etki gücüne
+    bağlıdır. Bu parametrelerle ilk çağrıda hesaplanıp cv2.convertMaps ile
+    remap'in en hızlı okuduğu sabit noktalı biçime çevrilir; sonraki karelerde
+    maliyet tek bir cv2.remap çağrısıdır.
+    """
+    key = (w, h, center_x, center_y, strength)
+    maps = _convex_map_cache.get(key)
+    if maps is None:
+        map_x, map_y = build_convex_maps(w, h, center_x, center_y, strength)
+        maps = _convex_map_cache[key] = cv2.convertMaps(map_x, map_y, cv2.CV_16SC2)
+    return maps
+
+# Kaplama katmanı önbelleği: (w, h, center_x, center_y, radius) -> MirrorOverlay
+_overlay_cache = {}
+
+class MirrorOverlay:
+    """Ayna maskesi, çerçeve halkaları ve parlamanın önceden hesaplanmış katmanı
+
+    Her kare için sonuç out = distorted * weight / 255 + offset biçimindedir:
+    weight yumuşatılmış daire maskesini ve parlamanın karartmasını, offset ise
+    halka renklerini ve parlamanın beyaz katkısını taşır. İkisi de sabit
+    olduğundan bir kez uint8 olarak hesaplanır ve karede yalnızca iki tamsayı
+    geçişi (cv2.multiply + cv2.add) kalır. Katman sadece aynanın sınır
+    kutusunu (roi) kapsar; kutunun dışı her zaman siyahtır.
+
+    scale, kare tam çözünürlüğe göre küçültülmüşse halka kalınlıklarını ve
+    bulanıklaştırma çekirdeklerini aynı oranda küçültür.
+    """
+
+    def __init__(self, w, h, center_x, center_y, radius, scale=1.0):
+        center = (center_x, center_y)
+
+        def px(value):
+            return max(1, round(value * scale))
+
+        def kernel(size):
+            return (px(size) | 1,) * 2  # Tek sayı olmalı
+
+        # Ayna efektini sadece daire içine uygula - kenarları yumuşatılmış maske
+        mask = np.zeros((h, w), np.uint8)
+        cv2.circle(mask, center, radius, 255, -1)
+        mask = cv2.GaussianBlur(mask, kernel(9), 0)
+
+        # Ayna çerçevesi: dış turuncu, orta siyah ve iç turuncu halka.
+        # Halkalar maskelenmiş görüntünün üzerine opak çizildiği için renkleri ve kapladıkları pikseller ayrı tutulur.
+        ring_color = np.zeros((h, w, 3), np.uint8)
+        ring_cover = np.zeros((h, w), np.uint8)
+        for ring_radius, color, thickness in ((radius + px(10), orange, px(10)),
+                                              (radius + px(5), black, px(5)),
+                                              (radius, orange, px(2))):
+            cv2.circle(ring_color, center, ring_radius, color, thickness)
+            cv2.circle(ring_cover, center, ring_radius, 255, thickness)
+
+        # Ayna yüzeyinde hafif parlaklık efekti
+        shine = np.zeros((h, w), np.uint8)
+        cv2.ellipse(shine, (center_x - radius//4, center_y - radius//4),
+                    (radius//3, radius//2), 30, 0, 360, 255, -1)
+        shine = cv2.GaussianBlur(shine, kernel(51), 0)
+
+        # result = distorted * mask (halkalarda halka rengi), ardından
+        # (1 - 0.15*s)*result + 0.15*s*255 parlaması tek doğrusal ifadeye indirgenir
+        s = shine[..., None] * (0.15 / 255.0)
+        ring = ring_cover[..., None] > 0
+        weight = np.where(ring, 0.0, mask[..., None] / 255.0 * (1.0 - s))
+        offset = np.where(ring, ring_color * (1.0 - s), 0.0) + 255.0 * s
+        weight = np.broadcast_to(weight, offset.shape)
+
+        # Katmanın etkili olduğu sınır kutusu
+        active = (weight > 0).any(axis=2) | (offset >= 0.5).any(axis=2)
+        rows = np.flatnonzero(active.any(axis=1))
+        cols = np.flatnonzero(active.any(axis=0))
+        self.roi = (slice(rows[0], rows[-1] + 1), slice(cols[0], cols[-1] + 1))
+        self.weight = np.round(weight[self.roi] * 255.0).astype(np.uint8)
+        self.offset = np.round(offset[self.roi]).astype(np.uint8)
+
+    def apply(self, distorted, out):
+        """Katmanı sınır kutusundaki bozulmuş görüntüyle birleştirip out içine yazar"""
+        self.blend_rows(distorted, out, 0, self.weight.shape[0])
+        return self.clear_outside(out)
+
+    def blend_rows(self, distorted, out, r0, r1):
+        """Sınır kutusunun [r0, r1) satırlarını (kutuya göre) birleştirir
+
+        Satır aralıkları çakışmadığı sürece farklı iş parçacıklarından aynı
+        anda çağrılabilir.
+        """
+        rows, cols = self.roi
+        target = out[rows.start + r0:rows.start + r1, cols]
+        cv2.multiply(distorted[r0:r1], self.weight[r0:r1], dst=target, scale=1.0 / 255.0)
+        cv2.add(target, self.offset[r0:r1], dst=target)
+
+    def clear_outside(self, out):
+        """Sınır kutusunun dışını siyaha boyar"""
+        rows, cols = self.roi
+        out[:rows.start] = 0
+        out[rows.stop:] = 0
+        out[rows, :cols.start] = 0
+        out[rows, cols.stop:] = 0
+        return out
+
+def get_overlay(w, h, center_x, center_y, radius, scale=1.0):
+    """Verilen boyut ve ayna geometrisi için kaplama katmanını önbellekten döndürür"""
+    key = (w, h, center_x, center_y, radius, scale)
+    overlay = _overlay_cache.get(key)
+    if overlay is None:
+        overlay = _overlay_cache[key] = MirrorOverlay(*key)
+    return overlay
+
+class MirrorRenderer:
+    """Dışbükey ayna efektini önceden ayrılmış tamponlarla hesaplar
+
+    Bütün ara diziler (koordinat haritaları, kaplama katmanı, float32
+    tamponlar) pencere boyutu için bir kez ayrılır. render() her karede
+    yalnızca bu tamponlara yazar, böylece kare başına bellek ayırma yapılmaz.
+    Ayna dışı her zaman siyah olduğundan remap ve birleştirme yalnızca aynanın
+    sınır kutusunda yapılır.
+
+    Sınır kutusu yatay şeritlere bölünebilir: her şeridin remap'i ve
+    birleştirmesi iş parçacığı havuzunda eşzamanlı çalışır. cv2.remap,
+    cv2.multiply ve cv2.add GIL'i bıraktığı için şeritler gerçekten paralel
+    işlenir; her çıktı pikseli yalnızca haritadaki kendi koordinatına bağlı
+    olduğundan sonuç tek geçişle bit bit aynıdır.
+
+    Parametreler:
+    w, h -- Kare genişliği ve yüksekliği
+    strength -- Dışbükey etki gücü
+    stripes -- Şerit sayısı; 'auto' ise ilk karelerde ölçülerek seçilir
+    scale -- Kare kamera çözünürlüğüne göre küçültülerek işleniyorsa oran;
+             piksel cinsinden sabitler (kenar payı, halkalar, mercek yarıçapı)
+             bununla çarpılır, böylece ayna her ölçekte aynı görünür
+    """
+
+    def __init__(self, w, h, strength=distortion_strength, stripes=1, scale=1.0):
+        self.w, self.h = w, h
+        self.strength = strength
+        self.scale = scale
+
+        # Koordinat eksenlerini önceden hesapla (performans için)
+        self.xs = np.arange(w, dtype=np.float32)
+        self.ys = np.arange(h, dtype=np.float32)
+
+        # Maskeleri oluştur
+        self.circle_radius = min(w, h) // 2 - round(30 * scale)
+        self.center_x, self.center_y = w // 2, h // 2
+        # Python float: NumPy float64 ölçek float32 tamponlarla çarpılırken ara tampon ayırırdı
+        self.max_dist = float(np.sqrt((w//2)**2 + (h//2)**2))
+
+        # Dışbükey haritalar yalnızca parametre değiştiğinde yeniden alınır
+        self._convex_key = None
+        self._convex = None
+
+        # Büyüteç penceresi için koordinat haritaları ve float32 ara tamponlar.
+        # Boyutları kamera çözünürlüğüne değil mercek yarıçapına bağlıdır.
+        self.lens_radius = concave_radius * scale
+        self.lens_half = int(np.ceil(magnifier_extent * self.lens_radius))
+        lens_size = 2 * self.lens_half + 1
+        self.map_x = np.empty((lens_size, lens_size), np.float32)
+        self.map_y = np.empty((lens_size, lens_size), np.float32)
+        self._t = np.empty((lens_size, lens_size), np.float32)
+        self._t2 = np.empty((lens_size, lens_size), np.float32)
+        self._dx = np.empty(lens_size, np.float32)
+        self._dy = np.empty(lens_size, np.float32)
+        self._dx2 = np.empty(lens_size, np.float32)
+        self._dy2 = np.empty(lens_size, np.float32)
+
+        # Maske, halkalar ve parlama bir kez hazırlanır
+        self.overlay = get_overlay(w, h, self.center_x, self.center_y, self.circle_radius, scale)
+        rows, cols = self.overlay.roi
+        self.distorted = np.empty((rows.stop - rows.start, cols.stop - cols.start, 3), np.uint8)
+
+        self._executor = None
+        self.set_stripes(stripes)
+
+    def set_stripes(self, stripes):
+        """Şerit sayısını ayarlar; 'auto' verilirse sonraki render() ölçüm yapar"""
+        self._autotune = stripes == 'auto'
+        count = 1 if self._autotune else max(1, int(stripes))
+        roi_height = self.distorted.shape[0]
+        count = min(count, roi_height)
+        self.stripes = count
+        self._bounds = [(roi_height * i // count, roi_height * (i + 1) // count) for i in range(count)]
+
+        # İlk şerit çağıran iş parçacığında işlenir, havuzda bir eksik işçi yeterlidir
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if count > 1:
+            self._executor = ThreadPoolExecutor(max_workers=count - 1, thread_name_prefix="MirrorStripe")
+
+    def stripe_candidates(self):
+        """Otomatik ayarda denenecek şerit sayıları (1, 2, 4, ... en fazla 2 x çekirdek)"""
+        limit = min(2 * (os.cpu_count() or 1), max(1, self.distorted.shape[0] // 16))
+        candidates = [1]
+        while candidates[-1] * 2 <= limit:
+            candidates.append(candidates[-1] * 2)
+        return candidates
+
+    def tune_stripes(self, frame, out, pressed=False, px=0, py=0):
+        """Aday şerit sayılarını bu karede ölçüp en hızlısını seçer
+
+        Dönüş:
+        Seçilen şerit sayısı
+        """
+        timings = {}
+        for count in self.stripe_candidates():
+            self.set_stripes(count)
+            self._render(frame, out, pressed, px, py)  # Isınma
+            start = time.perf_counter()
+            for _ in range(stripe_tune_frames):
+                self._render(frame, out, pressed, px, py)
+            timings[count] = (time.perf_counter() - start) / stripe_tune_frames
+        # Ölçüm gürültüsüyle gereksiz iş parçacığı açılmasın: daha fazla şerit
+        # ancak belirgin şekilde (%5'ten fazla) hızlıysa seçilir
+        best = 1
+        for count, seconds in timings.items():
+            if seconds < timings[best] * 0.95:
+                best = count
+        self.set_stripes(best)
+        print(f"Şerit sayısı otomatik seçildi: {best} ({timings[best] * 1000:.1f} ms/kare)")
+        return best
+
+    def close(self):
+        """Şerit iş parçacığı havuzunu kapatır"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def lens_window(self, px, py):
+        """Büyüteç penceresinin aynanın sınır kutusuyla kesişimini döndürür
+
+        Dönüş:
+        (y0, y1, x0, x1) kare koordinatlarında; kesişim yoksa None
+        """
+        rows, cols = self.overlay.roi
+        half = self.lens_half
+        y0, y1 = max(py - half, rows.start), min(py + half + 1, rows.stop)
+        x0, x1 = max(px - half, cols.start), min(px + half + 1, cols.stop)
+        if y0 >= y1 or x0 >= x1:
+            return None
+        return y0, y1, x0, x1
+
+    def compute_magnifier_maps(self, px, py, window):
+        """Tıklanan nokta etrafında büyüteç haritalarını yalnızca pencere için hesaplar
+
+        Büyüteç aynanın üzerine uygulanır: önce büyüteç, gösterilen noktayı
+        ayna üzerindeki bir noktaya taşır, ardından dışbükey dönüşüm o noktayı
+        kaynak kareye taşır. İki dönüşüm tek haritada birleştiği için kare
+        yalnızca bir kez INTER_CUBIC ile örneklenir.
+
+        Hesap kare başına bellek ayırmaz. Pencere görünümleri tamponların
+        başından bitişik olarak alınır ([:hh, :ww] dilimi bitişik olmazdı) ve
+        satır/sütun vektörleri hesaba girmeden önce np.copyto ile pencereye
+        genişletilir; iki durumda da NumPy her işlemde ara tampon ayırırdı.
+
+        Dönüş:
+        Pencere boyutunda map_x, map_y görünümleri
+        """
+        y0, y1, x0, x1 = window
+        hh, ww = y1 - y0, x1 - x0
+        dx, dy = self._dx[:ww], self._dy[:hh]
+        dx2, dy2 = self._dx2[:ww], self._dy2[:hh]
+        t, t2 = lens_view(self._t, hh, ww), lens_view(self._t2, hh, ww)
+        map_x, map_y = lens_view(self.map_x, hh, ww), lens_view(self.map_y, hh, ww)
+
+        # Tıklanan noktaya olan uzaklık (satır ve sütun eksenleri ayrı hesaplanır)
+        np.subtract(self.xs[x0:x1], px, out=dx)
+        np.subtract(self.ys[y0:y1], py, out=dy)
+        np.multiply(dx, dx, out=dx2)
+        np.multiply(dy, dy, out=dy2)
+        np.copyto(t, dy2[:, None])
+        np.copyto(t2, dx2[None, :])
+        t += t2
+
+        # Büyüteç efekt maskesi - Gaussian fonksiyonu (büyütme faktörüyle çarpılmış)
+        t *= -1.0 / (2 * self.lens_radius**2)
+        np.exp(t, out=t)
+        t *= magnification
 
-while True:
-    ret, frame = cap.read()
-    if not ret: 
-        print("Kamera görüntüsü alınamadı!")
-        break
-    
-    # Görüntüyü yatay olarak çevir (ayna etkisi)
-    frame = cv2.flip(frame, 1)
-    
-    # Görüntüyü boş bir siyah arka plana kopyala
-    result = np.zeros_like(frame)
-    
-    # Mouse basılıysa büyüteç efekti ekle
-    if mouse_pressed:
-        # Tıklanan noktaya olan uzaklık
-        click_dx = xx - press_x
-        click_dy = yy - press_y
-        click_distance = np.sqrt(click_dx**2 + click_dy**2)
-        
-        # Büyüteç efekt maskesi - Gaussian fonksiyonu
-        magnify_mask = np.exp(-(click_distance**2) / (2 * concave_radius**2))
-        
-        # Koordinatları tıklanan noktaya göre ayarla
-        dx = (xx - press_x)
-        dy = (yy - press_y)
-        
-        # Büyütme efekti uygula
-        dx_magnified = dx * magnify_mask * magnification
-        dy_magnified = dy * magnify_mask * magnification
-        
         # Yeni koordinatları hesapla
-        map_x = (xx - dx_magnified).astype(np.float32)
-        map_y = (yy - dy_magnified).astype(np.float32)
+        np.copyto(t2, dx[None, :])
+        np.multiply(t, t2, out=map_x)
+        np.copyto(t2, self.xs[None, x0:x1])
+        np.subtract(t2, map_x, out=map_x)
+        np.copyto(t2, dy[:, None])
+        np.multiply(t, t2, out=map_y)
+        np.copyto(t2, self.ys[y0:y1, None])
+        np.subtract(t2, map_y, out=map_y)
+
+        # Dışbükey dönüşümü büyütülmüş koordinatlara uygula
+        convex_coordinates(map_x, map_y, self.center_x, self.center_y, self.strength,
+                           self.max_dist, t, t2)
+        return map_x, map_y
+
+    def convex_maps(self):
+        """Geçerli parametreler için sabit noktalı dışbükey haritaları döndürür"""
+        key = (self.w, self.h, self.center_x, self.center_y, self.strength)
+        if key != self._convex_key:
+            # Parametre değiştiyse önbellekten al veya yeniden oluştur
+            self._convex = get_convex_maps(*key)
+            self._convex_key = key
+        return self._convex
+
+    def render(self, frame, out=None, pressed=False, px=0, py=0):
+        """Aynalanmış kareye ayna efektini uygular
+
+        Parametreler:
+        frame -- Aynalanmış kamera karesi
+        out -- Sonucun yazılacağı uint8 tampon (None ise yeni dizi ayrılır)
+        pressed, px, py -- Mouse basılı mı ve basılan nokta
+
+        Dönüş:
+        Efekt uygulanmış görüntü (out)
+        """
+        if out is None:
+            out = np.empty_like(frame)
+        if self._autotune:
+            self.tune_stripes(frame, out, pressed, px, py)
+        return self._render(frame, out, pressed, px, py)
+
+    def _render(self, frame, out, pressed, px, py):
+        map1, map2 = self.convex_maps()
+        lens = None
+        if pressed:
+            # Büyüteç haritaları bir kez, tüm pencere için hesaplanır; şeritler kendi satırlarını okur
+            window = self.lens_window(px, py)
+            if window is not None:
+                lens = window, self.compute_magnifier_maps(px, py, window)
+
+        if self._executor is None:
+            self._render_stripe(frame, out, map1, map2, lens, *self._bounds[0])
+        else:
+            futures = [self._executor.submit(self._render_stripe, frame, out, map1, map2, lens, r0, r1)
+                       for r0, r1 in self._bounds[1:]]
+            self._render_stripe(frame, out, map1, map2, lens, *self._bounds[0])
+            for future in futures:
+                future.result()
+
+        return self.overlay.clear_outside(out)
+
+    def _render_stripe(self, frame, out, map1, map2, lens, r0, r1):
+        # Sınır kutusunun [r0, r1) satırlarını işler (kutuya göre satır indeksleri)
+        rows, cols = self.overlay.roi
+        top = rows.start
+
+        # Distorsiyon uygula (önbellekteki dışbükey haritalarla, yalnızca aynanın sınır kutusunda)
+        cv2.remap(frame, map1[top + r0:top + r1, cols], map2[top + r0:top + r1, cols],
+                  interpolation=cv2.INTER_CUBIC,
+                  borderMode=cv2.BORDER_REPLICATE, dst=self.distorted[r0:r1])
+
+        if lens is not None:
+            # Büyüteç: mercek penceresi dışında yalnızca dışbükey dönüşüm geçerlidir,
+            # pencere birleşik haritayla doğrudan kaynak kareden yeniden örneklenir
+            (y0, y1, x0, x1), (map_x, map_y) = lens
+            ly0, ly1 = max(y0, top + r0), min(y1, top + r1)
+            if ly0 < ly1:
+                cv2.remap(frame, map_x[ly0 - y0:ly1 - y0], map_y[ly0 - y0:ly1 - y0],
+                          interpolation=cv2.INTER_CUBIC,
+                          borderMode=cv2.BORDER_REPLICATE,
+                          dst=self.distorted[ly0 - top:ly1 - top,
+                                             x0 - cols.start:x1 - cols.start])
+
+        # Maske, halkalar ve parlamayı tek adımda ekle
+        self.overlay.blend_rows(self.distorted, out, r0, r1)
+
+def main(argv=None):
+    """Kameradan (veya video dosyasından) dışbükey ayna efektini gösterir"""
+    parser = argparse.ArgumentParser(description="Dışbükey trafik aynası efekti")
+    parser.add_argument('--source', default='0', help="Kamera indeksi, video dosyası veya kare günlüğü (.twj)")
+    parser.add_argument('--journal', help="Ham kamera karelerini bu kare günlüğüne (.twj) yaz")
+    parser.add_argument('--threaded', action='store_true',
+                        help="Yakalama, işleme ve gösterim aşamalarını ayrı iş parçacıklarında çalıştır")
+    parser.add_argument('--stripes', default='1',
+                        help="Ayna hesabının bölüneceği yatay şerit sayısı veya 'auto' (ölçerek seç)")
+    parser.add_argument('--process-scale', type=float, default=1.0,
+                        help="Efektin hesaplanıp önizlendiği çözünürlüğün kamera çözünürlüğüne oranı "
+                             "(ör. 0.5 zayıf cihazlarda akıcı önizleme sağlar)")
+    parser.add_argument('--http', type=int, metavar='PORT',
+                        help="Görüntüyü bu porttan MJPEG olarak da yayınla (tarayıcıyla izlemek için)")
+    parser.add_argument('--http-host', default='127.0.0.1',
+                        help="MJPEG yayınının dinleyeceği adres (başka makinelerden izlemek için 0.0.0.0)")
+    parser.add_argument('--metrics', action='store_true', help="Aşama sürelerini ölç ve çıkışta özetle")
+    parser.add_argument('--hud', action='store_true', help="Aşama sürelerini ekranda göster (--metrics içerir)")
+    parser.add_argument('--metrics-out', help="Aşama ölçümlerinin kaydedileceği .json veya .csv dosyası")
+    args = parser.parse_args(argv)
+    if args.process_scale <= 0:
+        parser.error("--process-scale pozitif olmalı")
+    stripes = args.stripes if args.stripes == 'auto' else int(args.stripes)
+    metrics = StageMetrics() if args.metrics or args.hud or args.metrics_out else NULL_METRICS
+
+    # Kamera aç
+    cap, live = open_source(args.source)
+    if not cap.isOpened():
+        print("Kamera açılamadı!")
+        return
+
+    # Pencere oluştur ve mouse callback'i ekle. Küçük ölçekte pencere kareyi
+    # büyüterek gösterir; mouse koordinatları yine kare koordinatlarında gelir.
+    scaled = args.process_scale != 1.0
+    cv2.namedWindow(window_name, cv2.WINDOW_NORMAL if scaled else cv2.WINDOW_AUTOSIZE)
+    cv2.setMouseCallback(window_name, mouse_callback)
+
+    # Ekran boyutlarını al
+    ret, raw = cap.read()
+    if not ret:
+        print("Kamera görüntüsü alınamadı!")
+        return
+
+    h, w = raw.shape[:2]
+    if scaled:
+        cv2.resizeWindow(window_name, w, h)
+    # Haritalar, maske ve birleştirme işleme boyutunda hesaplanır
+    size = scaled_size(w, h, args.process_scale)
+    renderer = MirrorRenderer(*size, stripes=stripes, scale=args.process_scale)
+    journal = open_journal(args.journal, cap, live, raw) if args.journal else None
+
+    def process(frame, out, timestamp):
+        # Mouse durumu gösterim iş parçacığındaki callback ile güncellenir
+        return renderer.render(frame, out, mouse_pressed, press_x, press_y)
+
+    # Tarayıcıdan izleme - her kare bir kez kodlanıp bütün izleyicilere gönderilir
+    http = MJPEGServer(args.http, args.http_host, title=window_name) if args.http is not None else None
+    if http is not None:
+        print(f"MJPEG yayını: {http.address}")
+
+    # Yakalama -> işleme -> gösterim. Tamponlar havuzdan yeniden kullanılır,
+    # kare başına bellek ayrılmaz.
+    pipe = FramePipeline(cap, process, live=live, threaded=args.threaded, metrics=metrics, journal=journal,
+                         size=size if scaled else None)
+
+    for result, timestamp in pipe.frames():
+        metrics.frame()
+        if args.hud:
+            metrics.draw_hud(result)
+
+        # İzleyici varsa kareyi yayınla (yavaş izleyiciler kare atlar, döngü beklemez)
+        if http is not None:
+            with metrics.stage('yayın'):
+                http.publish(result)
+
+        # Sonucu göster
+        with metrics.stage('gösterim'):
+            cv2.imshow(window_name, result)
+            pipe.release(result)
+            key = cv2.waitKey(1)
+
+        # ESC ile çık
+        if key == 27:
+            break
     else:
-        # Normal dışbükey efekt için koordinatları hesapla
-        dx = xx - center_x
-        dy = yy - center_y
-        
-        # Merkeze olan uzaklığı hesapla
-        distance = np.sqrt(dx*dx + dy*dy)
-        max_dist = np.sqrt((w//2)**2 + (h//2)**2)
-        
-        # Normalize edilmiş mesafe
-        normalized_dist = distance / max_dist
-        
-        # Dışbükey distorsiyon faktörü
-        factor = 1 + (np.arctan(normalized_dist * distortion_strength) / (np.pi/2))
-        
-        # Yeni koordinatları hesapla
-        map_x = (center_x + dx/factor).astype(np.float32)
-        map_y = (center_y + dy/factor).astype(np.float32)
-    
-    # Distorsiyon uygula
-    distorted = cv2.remap(frame, map_x, map_y, 
-                         interpolation=cv2.INTER_CUBIC,
-                         borderMode=cv2.BORDER_REPLICATE)
-    
-    # Ayna efektini sadece daire içine uygula
-    mask = np.zeros((h, w), dtype=np.uint8)
-    cv2.circle(mask, (center_x, center_y), circle_radius, 255, -1)
-    
-    # Maske kenarlarını yumuşatma
-    mask = cv2.GaussianBlur(mask, (9, 9), 0)
-    
-    # Daire dışı siyah, içi ayna efekti
-    mask_3ch = cv2.merge([mask, mask, mask]) / 255.0
-    result = distorted * mask_3ch
-    
-    # Ayna çerçevesi
-    # Dış turuncu halka
-    cv2.circle(result, (center_x, center_y), circle_radius + 10, orange, 10)
-    # Orta siyah halka
-    cv2.circle(result, (center_x, center_y), circle_radius + 5, black, 5)
-    # İç turuncu halka
-    cv2.circle(result, (center_x, center_y), circle_radius, orange, 2)
-    
-    # Ayna yüzeyinde hafif parlaklık efekti
-    shine = np.zeros_like(mask)
-    cv2.ellipse(shine, (center_x - circle_radius//4, center_y - circle_radius//4), 
-                (circle_radius//3, circle_radius//2), 30, 0, 360, 255, -1)
-    shine = cv2.GaussianBlur(shine, (51, 51), 0)
-    
-    # Parlamayı ekle
-    shine_3ch = cv2.merge([shine, shine, shine]) / 255.0
-    white = np.ones_like(result) * 255
-    result = (1.0 - 0.15 * shine_3ch) * result + 0.15 * shine_3ch * white
-    result = result.astype(np.uint8)
-    
-    # Sonucu göster
-    cv2.imshow(window_name, result)
-    
-    # ESC ile çık
-    if cv2.waitKey(1) == 27:
-        break
-
-cap.release()
-cv2.destroyAllWindows()
+        print("Kamera görüntüsü alınamadı!")
+
+    pipe.stop()
+    renderer.close()
+    if journal is not None:
+        journal.close()
+    if http is not None:
+        http.close()
+    cap.release()
+    cv2.destroyAllWindows()
+
+    report_metrics(metrics, args.metrics_out)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+import shutil
+import subprocess
+import time
+
+import cv2
+import numpy as np
+
+# Kayıtta kullanılabilen kodlayıcı arka uçları
+ENCODER_BACKENDS = ('opencv', 'ffmpeg')
+
+
+class Encoder:
+    """Video kodlayıcı arayüzü
+
+    Alt sınıflar _open, _write ve _close metotlarını sağlar. Temel sınıf
+    kodlanan kare sayısını ve write()/close() içinde geçen süreyi tutar.
+    Karelerin gelmesini beklerken geçen zaman sayılmaz, kapanışta bekleyen
+    karelerin bitirilmesi sayılır; böylece throughput canlı kayıtta da
+    kameranın hızını değil kodlayıcının kapasitesini gösterir.
+
+    Parametreler:
+    codec -- Kodlayıcıya özgü codec adı (None ise arka ucun varsayılanı)
+    """
+
+    extension = '.avi'  # Varsayılan dosya uzantısı (kap biçimi)
+    default_codec = None
+
+    def __init__(self, codec=None):
+        self.codec = codec or self.default_codec
+        self.path = None
+        self.fps = None
+        self.frames = 0
+        self.seconds = 0.0
+        self._open_flag = False
+
+    @property
+    def is_open(self):
+        return self._open_flag
+
+    @property
+    def throughput(self):
+        """Saniyede kodlanan kare sayısı"""
+        return self.frames / self.seconds if self.seconds > 0 else 0.0
+
+    def open(self, path, width, height, fps):
+        """path dosyasını verilen boyut ve FPS ile yazmaya açar"""
+        self.path, self.fps = path, fps
+        self.frames = 0
+        self.seconds = 0.0
+        self._open(path, width, height, fps)
+        self._open_flag = True
+
+    def write(self, frame):
+        """Bir BGR kareyi kodlayıcıya gönderir"""
+        start = time.perf_counter()
+        self._write(frame)
+        self.seconds += time.perf_counter() - start
+        self.frames += 1
+
+    def close(self):
+        """Bekleyen kareleri bitirip dosyayı kapatır"""
+        if not self._open_flag:
+            return
+        start = time.perf_counter()
+        try:
+            self._close()
+        finally:
+            self.seconds += time.perf_counter() - start
+            self._open_flag = False
+
+    def _open(self, path, width, height, fps):
+        raise NotImplementedError
+
+    def _write(self, frame):
+        raise NotImplementedError
+
+    def _close(self):
+        raise NotImplementedError
+
+
+class OpenCVEncoder(Encoder):
+    """cv2.VideoWriter ile kodlama (FourCC codec, varsayılan XVID/AVI)"""
+
+    extension = '.avi'
+    default_codec = 'XVID'
+
+    def _open(self, path, width, height, fps):
+        fourcc = cv2.VideoWriter_fourcc(*self.codec)
+        self._writer = cv2.VideoWriter(path, fourcc, fps, (width, height))
+        if not self._writer.isOpened():
+            raise RuntimeError(f"Video yazıcı açılamadı: {path} ({self.codec})")
+
+    def _write(self, frame):
+        self._writer.write(frame)
+
+    def _close(self):
+        self._writer.release()
+        self._writer = None
+
+
+class FFmpegEncoder(Encoder):
+    """Ham BGR kareleri yerel ffmpeg sürecine boru üzerinden aktararak kodlar
+
+    Kodlama ayrı bir süreçte ve ffmpeg'in kendi iş parçacıklarıyla yapılır;
+    Python tarafında kare başına yalnızca boruya yazma kalır. Kap biçimi
+    dosya uzantısından belirlenir (varsayılan MP4/H.264).
+
+    Parametreler:
+    codec -- ffmpeg kodlayıcı adı (varsayılan libx264)
+    preset -- Kodlayıcı hız/sıkıştırma ayarı
+    crf -- Sabit kalite değeri (küçük = daha iyi kalite)
+    threads -- Kodlayıcı iş parçacığı sayısı (0: ffmpeg seçer)
+    executable -- ffmpeg çalıştırılabilir dosyası
+    """
+
+    extension = '.mp4'
+    default_codec = 'libx264'
+
+    def __init__(self, codec=None, preset='veryfast', crf=23, threads=0, executable='ffmpeg'):
+        super().__init__(codec)
+        self.preset = preset
+        self.crf = crf
+        self.threads = threads
+        self.executable = executable
+        self._process = None
+
+    @classmethod
+    def available(cls, executable='ffmpeg'):
+        """ffmpeg PATH üzerinde bulunuyor mu?"""
+        return shutil.which(executable) is not None
+
+    def command(self, path, width, height, fps):
+        """ffmpeg komut satırı"""
+        cmd = [self.executable, '-y', '-loglevel', 'error', '-nostats',
+               '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', f"{width}x{height}", '-r', f"{fps:.6g}",
+               '-i', '-', '-an', '-c:v', self.codec, '-threads', str(self.threads)]
+        if self.codec in ('libx264', 'libx265'):
+            cmd += ['-preset', self.preset, '-crf', str(self.crf), '-pix_fmt', 'yuv420p']
+        return cmd + [path]
+
+    def _open(self, path, width, height, fps):
+        if not self.available(self.executable):
+            raise RuntimeError(f"ffmpeg bulunamadı: {self.executable}")
+        self._shape = (height, width, 3)
+        self._process = subprocess.Popen(self.command(path, width, height, fps),
+                                         stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    def _write(self, frame):
+        if frame.shape != self._shape:
+            raise ValueError(f"Kare boyutu {frame.shape}, beklenen {self._shape}")
+        try:
+            # Bitişik kareler kopyalanmadan boruya yazılır
+            self._process.stdin.write(np.ascontiguousarray(frame).data)
+        except BrokenPipeError:
+            raise RuntimeError(f"ffmpeg beklenmedik şekilde kapandı: {self._stderr()}") from None
+
+    def _close(self):
+        process, self._process = self._process, None
+        try:
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+        error = process.stderr.read().decode(errors='replace').strip()
+        if process.wait() != 0:
+            raise RuntimeError(f"ffmpeg hata verdi ({process.returncode}): {error}")
+
+    def _stderr(self):
+        self._process.stdin.close()
+        return self._process.stderr.read().decode(errors='replace').strip()
+
+
+def create_encoder(backend='opencv', codec=None):
+    """Arka uç adına göre kodlayıcı oluşturur ('opencv' veya 'ffmpeg')"""
+    if backend == 'opencv':
+        return OpenCVEncoder(codec)
+    if backend == 'ffmpeg':
+        return FFmpegEncoder(codec)
+    raise ValueError(f"Bilinmeyen kodlayıcı: {backend}")
+
+
+def encoder_extension(backend):
+    """Arka ucun varsayılan dosya uzantısı"""
+    return {'opencv': OpenCVEncoder.extension, 'ffmpeg': FFmpegEncoder.extension}[backend]
+
+
+def measure_fps(timestamps, default=20.0):
+    """Kare zaman damgalarından ölçülen FPS; ölçülemiyorsa default
+
+    Parametreler:
+    timestamps -- Sırayla kare zaman damgaları (saniye)
+    default -- Yeterli ölçüm yoksa kullanılacak değer
+    """
+    if len(timestamps) < 2:
+        return default
+    span = timestamps[-1] - timestamps[0]
+    if span <= 0:
+        return default
+    # Yuvarlanmazsa FPS'ten türetilen zaman tabanının paydası MPEG-4 sınırını
+    # (65535) aşabilir ve cv2.VideoWriter açılamaz
+    return round((len(timestamps) - 1) / span, 2)
@@ -0,0 +1,270 @@
+import threading
+
+import cv2
+import numpy as np
+
+
+class Filter:
+    """Bir kez hazırlanan ve sonucu çağıranın tamponuna yazan filtre
+
+    Alt sınıflar LUT, renk matrisi gibi sabit verilerini yapıcıda hazırlar;
+    apply() her çağrıda yalnızca out tamponuna yazar. Ara sonuç tamponları
+    iş parçacığı başına ve boyut başına bir kez ayrılır.
+
+    apply_region() karenin yalnızca bir bölgesini, bütün kare filtrelenmiş
+    gibi hesaplar. Piksel başına çalışan filtrelerde bu bölgenin kendisidir;
+    komşuluğa ihtiyaç duyan filtreler halo kadar çevreyi de okur (kenar
+    algılamada sonuç tam kareyle bit bit aynı olmayabilir, bkz. EdgeFilter).
+    pointwise filtrelerde apply_filter bölgeyi doğrudan apply() ile işler.
+    """
+
+    name = ""
+    halo = 0  # Bölge dışından okunması gereken piksel sayısı
+    pointwise = False  # Her piksel yalnızca kendisine bağlı mı (bölge kendi başına filtrelenebilir)
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def apply(self, src, out):
+        """src görüntüsünü filtreleyip out tamponuna yazar ve out döndürür"""
+        raise NotImplementedError
+
+    def apply_region(self, frame, y0, y1, x0, x1, out):
+        """frame[y0:y1, x0:x1] bölgesini kare bağlamında filtreleyip out içine yazar"""
+        return self.apply(frame[y0:y1, x0:x1], out)
+
+    def scratch(self, key, shape, dtype=np.uint8):
+        """Bu iş parçacığına ait, yeniden kullanılan ara tamponu döndürür"""
+        buffers = getattr(self._local, 'buffers', None)
+        if buffers is None:
+            buffers = self._local.buffers = {}
+        buffer = buffers.get((key, shape))
+        if buffer is None:
+            buffer = buffers[(key, shape)] = np.empty(shape, dtype)
+        return buffer
+
+
+class IdentityFilter(Filter):
+    """Normal - filtre yok, görüntü olduğu gibi kopyalanır"""
+
+    name = "Normal"
+    pointwise = True
+
+    def apply(self, src, out):
+        # Dilim ataması np.copyto'dan hızlıdır (tür dönüşümü denetimi yok)
+        out[...] = src
+        return out
+
+
+class GrayFilter(Filter):
+    """Siyah-beyaz filtresi - gri tonlama tek kanala hesaplanıp üç kanala yayılır"""
+
+    name = "Siyah-Beyaz"
+    pointwise = True
+
+    def apply(self, src, out):
+        gray = self.scratch('gray', src.shape[:2])
+        cv2.cvtColor(src, cv2.COLOR_BGR2GRAY, dst=gray)
+        return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR, dst=out)
+
+
+class InvertFilter(Filter):
+    """Negatif filtresi - renkleri ters çevirir (255 - değer)
+
+    256 elemanlı tablo (cv2.LUT) ile de yapılabilir, ancak bitwise_not aynı
+    sonucu tablo okumadan ve ölçümlerde belirgin şekilde daha hızlı üretir.
+    """
+
+    name = "Negatif"
+    pointwise = True
+
+    def apply(self, src, out):
+        return cv2.bitwise_not(src, dst=out)
+
+
+class MatrixFilter(Filter):
+    """3x3 renk matrisini float32 olarak bir kez hazırlayan filtre (ör. sepya)
+
+    cv2.transform 8 bitlik girişte matrisi zaten float32'ye çevirir, bu yüzden
+    sonuç float64 matrisle aynıdır.
+    """
+
+    pointwise = True
+
+    def __init__(self, name, matrix):
+        super().__init__()
+        self.name = name
+        self.matrix = np.asarray(matrix, dtype=np.float32)
+
+    def apply(self, src, out):
+        return cv2.transform(src, self.matrix, dst=out)
+
+
+# Kenar algılama bandının çevresinden okunan piksel (doğruluk/maliyet dengesi, bkz. EdgeFilter)
+EDGE_HALO = 16
+
+
+class EdgeFilter(Filter):
+    """Kenar algılama filtresi - Canny kenarları üç kanala yayılır
+
+    Bölge filtrelenirken Canny bölgenin halo piksel genişletilmiş hali
+    üzerinde çalışır: Sobel (3x3) ve maksimum olmayanları bastırma için 2
+    piksel yeterlidir, kalan pay histerezisin zayıf kenarları güçlü kenarlara
+    bağlayabilmesi içindir. 2 piksellik tarama bandı tek başına filtrelenirse
+    hiç komşuluk bilgisi kalmaz.
+
+    Histerezisin erişimi sınırsız olduğundan hiçbir halo tam kareyle aynı
+    sonucu garanti etmez. Halo büyüdükçe sonuç tam kareye yaklaşır, bant
+    maliyeti de halo ile birlikte artar (benchmark.py filters); varsayılan
+    EDGE_HALO bu iki yön arasında bir dengedir. Çalışırken halo özniteliği
+    değiştirilebilir.
+    """
+
+    name = "Kenar Algılama"
+
+    def __init__(self, low=100, high=200, halo=EDGE_HALO):
+        super().__init__()
+        self.low, self.high = low, high
+        self.halo = halo
+
+    def apply(self, src, out):
+        edges = self.scratch('edges', src.shape[:2])
+        cv2.Canny(src, self.low, self.high, edges=edges)
+        return cv2.cvtColor(edges, cv2.COLOR_GRAY2BGR, dst=out)
+
+    def apply_region(self, frame, y0, y1, x0, x1, out):
+        h, w = frame.shape[:2]
+        ey0, ey1 = max(0, y0 - self.halo), min(h, y1 + self.halo)
+        ex0, ex1 = max(0, x0 - self.halo), min(w, x1 + self.halo)
+        edges = self.scratch('edges', (ey1 - ey0, ex1 - ex0))
+        cv2.Canny(frame[ey0:ey1, ex0:ex1], self.low, self.high, edges=edges)
+        return cv2.cvtColor(edges[y0 - ey0:y1 - ey0, x0 - ex0:x1 - ex0], cv2.COLOR_GRAY2BGR, dst=out)
+
+
+class MosaicFilter(Filter):
+    """Mozaik filtresi - küçültüp INTER_NEAREST ile büyüterek pikselleştirme"""
+
+    name = "Mozaik"
+
+    def __init__(self, factor=10):
+        super().__init__()
+        self.factor = factor
+
+    def apply(self, src, out):
+        h, w = src.shape[:2]
+        # Çok küçük görüntüleri kontrol et - sıfır bölme hatalarını önlemek için
+        new_w = max(1, w // self.factor)
+        new_h = max(1, h // self.factor)
+        if new_w < w and new_h < h:
+            small = self.scratch('small', (new_h, new_w) + src.shape[2:])
+            cv2.resize(src, (new_w, new_h), dst=small, interpolation=cv2.INTER_LINEAR)
+            return cv2.resize(small, (w, h), dst=out, interpolation=cv2.INTER_NEAREST)
+        # Boyut küçültemiyorsak olduğu gibi bırak
+        np.copyto(out, src)
+        return out
+
+    def apply_region(self, frame, y0, y1, x0, x1, out):
+        """Bölgeyi kareye hizalı factor x factor blok ızgarasında pikselleştirir
+
+        Bölge blok sınırlarına genişletilir, blok başına bir örnek alınıp
+        yalnızca istenen kısım geri yazılır. Kare boyutları factor'a
+        bölünebiliyorsa sonuç bütün karenin mozaiğindeki aynı bölgeyle bit bit
+        aynıdır; değilse son satır/sütundaki yarım bloklar kenar pikseli
+        tekrarlanarak tamamlanır.
+        """
+        h, w = frame.shape[:2]
+        f = self.factor
+        if max(1, w // f) >= w or max(1, h // f) >= h:
+            np.copyto(out, frame[y0:y1, x0:x1])
+            return out
+
+        # Blok ızgarasına hizalı bölge
+        ay0, ay1 = y0 // f * f, -(-y1 // f) * f
+        ax0, ax1 = x0 // f * f, -(-x1 // f) * f
+        src = frame[ay0:ay1, ax0:ax1]
+        pad_bottom, pad_right = ay1 - min(ay1, h), ax1 - min(ax1, w)
+        if pad_bottom or pad_right:
+            padded = self.scratch('padded', (ay1 - ay0, ax1 - ax0) + frame.shape[2:])
+            cv2.copyMakeBorder(src, 0, pad_bottom, 0, pad_right, cv2.BORDER_REPLICATE, dst=padded)
+            src = padded
+
+        blocks = ((ay1 - ay0) // f, (ax1 - ax0) // f)
+        small = self.scratch('small', blocks + frame.shape[2:])
+        cv2.resize(src, blocks[::-1], dst=small, interpolation=cv2.INTER_LINEAR)
+        aligned = self.scratch('aligned', (ay1 - ay0, ax1 - ax0) + frame.shape[2:])
+        cv2.resize(small, (ax1 - ax0, ay1 - ay0), dst=aligned, interpolation=cv2.INTER_NEAREST)
+        np.copyto(out, aligned[y0 - ay0:y1 - ay0, x0 - ax0:x1 - ax0])
+        return out
+
+
+# Filtre tablosu - indeks filtre tipidir (0-5). Her filtre modül yüklenirken bir kez hazırlanır.
+FILTERS = (
+    IdentityFilter(),
+    GrayFilter(),
+    InvertFilter(),
+    MatrixFilter("Sepya", [[0.272, 0.534, 0.131],
+                           [0.349, 0.686, 0.168],
+                           [0.393, 0.769, 0.189]]),
+    EdgeFilter(100, 200, EDGE_HALO),
+    MosaicFilter(10),
+)
+
+# Filtre adları - ekranda gösterilir
+FILTER_NAMES = [f.name for f in FILTERS]
+
+
+def apply_filter(frame, filter_type, out=None, region=None):
+    """Görüntüye farklı efektler uygular
+
+    Parametreler:
+    frame -- İşlenecek görüntü
+    filter_type -- Uygulanacak filtre tipi (0-5 arası değer)
+    out -- Sonucun yazılacağı tampon; verilirse yeni dizi ayrılmaz
+    region -- (satır dilimi, sütun dilimi); verilirse yalnızca frame[region]
+              hesaplanır, ama bütün kare filtreleniyormuş gibi (kenar algılama
+              halo kadar komşu pikseli görür ve tam kareye pratikte çok yakındır,
+              mozaik blokları kareye hizalıdır)
+
+    Dönüş:
+    Filtre uygulanmış görüntü (out verildiyse out)
+    """
+    if region is not None:
+        return _apply_region(frame, filter_type, region, out)
+
+    # Boş frame kontrolü - hataları önlemek için (boyutlardan biri 0 ise size da 0'dır)
+    if frame is None or not frame.size:
+        return frame
+
+    # Bilinmeyen filtre tipi ve normal filtre için orijinal görüntü
+    if not 0 < filter_type < len(FILTERS):
+        if out is None:
+            return frame
+        out[...] = frame
+        return out
+
+    if out is None:
+        out = np.empty_like(frame)
+    return FILTERS[filter_type].apply(frame, out)
+
+
+def _apply_region(frame, filter_type, region, out):
+    # Bilinmeyen filtre tipi normal filtre gibi kopyalanır
+    flt = FILTERS[filter_type] if 0 < filter_type < len(FILTERS) else FILTERS[0]
+    if flt.pointwise:
+        # Komşuluk okumayan filtrelerde bölge kendi başına filtrelenir; tarama
+        # bantları gibi küçük bölgelerde sınır hesabı filtreden pahalıya gelir
+        src = frame[region]
+        if not src.size:
+            return src
+        if out is None:
+            out = np.empty_like(src)
+        return flt.apply(src, out)
+
+    rows, cols = region
+    y0, y1, _ = rows.indices(frame.shape[0])
+    x0, x1, _ = cols.indices(frame.shape[1])
+    if y0 >= y1 or x0 >= x1:
+        return frame[rows, cols]
+    if out is None:
+        out = np.empty((y1 - y0, x1 - x0) + frame.shape[2:], frame.dtype)
+    return flt.apply_region(frame, y0, y1, x0, x1, out)
@@ -0,0 +1,137 @@
+import threading
+from collections import deque
+
+import numpy as np
+
+# Kuyruk dolduğunda uygulanacak politikalar
+POLICIES = ('block', 'drop_oldest', 'drop_newest')
+
+
+class QueueClosed(Exception):
+    """Kapatılmış kuyruğa yazma ya da boşalmış kapalı kuyruktan okuma denemesi"""
+
+
+class BoundedFrameQueue:
+    """Kareleri iş parçacıkları arasında taşıyan sınırlı kuyruk
+
+    Kuyruk dolduğunda politika devreye girer:
+    block -- Üretici yer açılana kadar bekler (geri basınç)
+    drop_oldest -- En eski kare atılır, en taze kare her zaman kuyruğa girer
+    drop_newest -- Yeni kare atılır, kuyruktakiler korunur
+
+    Kontrol mesajları (droppable=False) hiçbir zaman atılmaz ve sınırı aşabilir,
+    böylece 'kaydet' gibi komutlar üretici döngüyü bekletmeden iletilir.
+    Atılan öğeler on_drop ile geri bildirilir (tamponu havuza iade etmek için).
+    """
+
+    def __init__(self, maxsize=8, policy='block', on_drop=None):
+        if policy not in POLICIES:
+            raise ValueError(f"Bilinmeyen kuyruk politikası: {policy}")
+        self.maxsize = max(1, int(maxsize))
+        self.policy = policy
+        self.on_drop = on_drop
+        self.dropped = 0  # Atılan kare sayısı
+        self._items = deque()  # (öğe, atılabilir mi?) çiftleri
+        self._frames = 0  # Kuyruktaki atılabilir öğe sayısı
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def put(self, item, droppable=True, timeout=None):
+        """Öğeyi kuyruğa ekler
+
+        Dönüş:
+        Öğe kuyruğa girdiyse True, politika gereği atıldıysa False
+        """
+        dropped = None
+        with self._cond:
+            if self._closed:
+                raise QueueClosed()
+            if droppable and self._frames >= self.maxsize:
+                if self.policy == 'drop_newest':
+                    self.dropped += 1
+                    dropped = item
+                elif self.policy == 'drop_oldest':
+                    dropped = self._pop_oldest_frame()
+                    self.dropped += 1
+                else:
+                    # Geri basınç - tüketici yer açana kadar bekle
+                    if not self._cond.wait_for(lambda: self._frames < self.maxsize or self._closed, timeout):
+                        self.dropped += 1
+                        dropped = item
+                    elif self._closed:
+                        raise QueueClosed()
+            if dropped is not item:
+                self._items.append((item, droppable))
+                if droppable:
+                    self._frames += 1
+                self._cond.notify_all()
+        if dropped is not None and self.on_drop is not None:
+            self.on_drop(dropped)
+        return dropped is not item
+
+    def get(self, timeout=None):
+        """Kuyruktaki en eski öğeyi döndürür
+
+        Kuyruk kapatılıp boşaldığında QueueClosed, zaman aşımında TimeoutError fırlatır.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items or self._closed, timeout):
+                raise TimeoutError()
+            if not self._items:
+                raise QueueClosed()
+            item, droppable = self._items.popleft()
+            if droppable:
+                self._frames -= 1
+            self._cond.notify_all()
+            return item
+
+    def close(self):
+        """Kuyruğu kapatır; kalan öğeler hâlâ okunabilir"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __len__(self):
+        with self._cond:
+            return len(self._items)
+
+    def _pop_oldest_frame(self):
+        # Kontrol mesajlarını koruyarak en eski kareyi çıkar
+        for i, (item, droppable) in enumerate(self._items):
+            if droppable:
+                del self._items[i]
+                self._frames -= 1
+                return item
+        return None
+
+
+class FramePool:
+    """Aynı boyuttaki kare tamponlarını yeniden kullanan havuz
+
+    Kuyruğa giren her kare için yeni dizi ayırmak yerine önceden ayrılmış
+    tamponlar dolaşır; tampon bittiğinde havuz yalnızca bir kez büyür.
+    """
+
+    def __init__(self, count=8):
+        self.count = count
+        self.shape = None
+        self.dtype = None
+        self._free = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self, shape, dtype=np.uint8):
+        """Verilen boyutta boş bir tampon döndürür"""
+        with self._lock:
+            if shape != self.shape or dtype != self.dtype:
+                # Boyut değiştiyse eski tamponlar artık işe yaramaz
+                self.shape, self.dtype = shape, dtype
+                self._free = deque(np.empty(shape, dtype) for _ in range(self.count))
+            if self._free:
+                return self._free.popleft()
+        return np.empty(shape, dtype)
+
+    def release(self, buffer):
+        """Tamponu havuza geri verir"""
+        with self._lock:
+            if buffer.shape == self.shape and buffer.dtype == self.dtype:
+                self._free.append(buffer)
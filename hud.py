@@ -0,0 +1,75 @@
+import cv2
+import numpy as np
+
+# Hazırlanmış yazı katmanları: (text, font, font_scale, color, thickness) -> TextSprite
+_sprite_cache = {}
+
+
+class TextSprite:
+    """cv2.putText çıktısının bir kez çizilip saklanan hali
+
+    Yazı boş bir tuvale bir kez beyaz çizilir ve tuval alfa maskesi olarak
+    kullanılır (kenar yumuşatmalı pikseller kısmi alfa taşır). Karışım
+    out = image * (255 - alfa) / 255 + renk * alfa / 255 biçimindedir; iki
+    terim de sabit olduğundan bir kez uint8 olarak hesaplanır ve her karede
+    yalnızca yazının kapladığı küçük bölgede iki tamsayı geçişi
+    (cv2.multiply + cv2.add) kalır. Sonuç putText ile en fazla yuvarlama
+    farkı kadar (1 gri seviye) ayrışır.
+
+    Parametreler:
+    text -- Yazı
+    font -- OpenCV yazı tipi
+    font_scale -- Yazı boyutu
+    color -- BGR renk
+    thickness -- Çizgi kalınlığı
+    """
+
+    def __init__(self, text, font, font_scale, color, thickness):
+        (text_w, text_h), baseline = cv2.getTextSize(text, font, font_scale, thickness)
+        # Kalın çizgiler ve bazı karakterler getTextSize kutusunun dışına taşabilir
+        pad = 2 * thickness + 4
+        canvas = np.zeros((text_h + baseline + 2 * pad, text_w + 2 * pad), np.uint8)
+        origin = (pad, pad + text_h)
+        cv2.putText(canvas, text, origin, font, font_scale, 255, thickness)
+
+        ys, xs = np.nonzero(canvas)
+        if len(ys) == 0:
+            # Boş yazı - çizilecek piksel yok
+            alpha = np.zeros((0, 0), np.uint8)
+            self.dx = self.dy = 0
+        else:
+            y0, y1, x0, x1 = ys.min(), ys.max() + 1, xs.min(), xs.max() + 1
+            alpha = canvas[y0:y1, x0:x1]
+            # Yazının sol üst köşesinin putText başlangıç noktasına göre konumu
+            self.dx, self.dy = int(x0 - origin[0]), int(y0 - origin[1])
+
+        a = alpha[..., None].astype(np.float32)
+        self.weight = np.ascontiguousarray(np.broadcast_to(255 - alpha[..., None], alpha.shape + (3,)))
+        self.offset = np.round(np.asarray(color, np.float32) * a / 255.0).astype(np.uint8)
+
+    def blit(self, image, org):
+        """Yazıyı image üzerine putText(image, text, org, ...) ile aynı konuma kopyalar"""
+        h, w = self.weight.shape[:2]
+        x, y = org[0] + self.dx, org[1] + self.dy
+        # Görüntü dışına taşan kısmı kırp
+        sx0, sy0 = max(0, -x), max(0, -y)
+        sx1, sy1 = min(w, image.shape[1] - x), min(h, image.shape[0] - y)
+        if sx0 >= sx1 or sy0 >= sy1:
+            return image
+        target = image[y + sy0:y + sy1, x + sx0:x + sx1]
+        cv2.multiply(target, self.weight[sy0:sy1, sx0:sx1], dst=target, scale=1.0 / 255.0)
+        cv2.add(target, self.offset[sy0:sy1, sx0:sx1], dst=target)
+        return image
+
+
+def text_sprite(text, font_scale, color, thickness, font=cv2.FONT_HERSHEY_SIMPLEX):
+    """Verilen yazı ve stil için hazırlanmış katmanı önbellekten döndürür
+
+    Yazı değiştiğinde (ör. filtre adı) yeni anahtar oluşur; aynı yazı ikinci
+    kez çizilmez.
+    """
+    key = (text, font, font_scale, tuple(color), thickness)
+    sprite = _sprite_cache.get(key)
+    if sprite is None:
+        sprite = _sprite_cache[key] = TextSprite(text, font, font_scale, color, thickness)
+    return sprite
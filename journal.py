@@ -0,0 +1,179 @@
+import os
+import struct
+
+import cv2
+import numpy as np
+
+from encoders import measure_fps
+
+# Ham kare günlüğü dosya uzantısı (open_source bu uzantıyı günlük olarak açar)
+JOURNAL_EXTENSION = '.twj'
+
+_MAGIC = b'TWJRNL01'
+# Başlık: sihirli sözcük, yükseklik, genişlik, kanal sayısı, numpy dtype metni
+_HEADER = struct.Struct('<8sIII8s')
+_HEADER_SIZE = 64
+# Her kayıt 64 baytlık zaman damgası yuvası ve ardından 64 bayta hizalanmış karedir
+_SLOT_SIZE = 64
+_ALIGN = 64
+
+
+def _record_size(frame_bytes):
+    return _SLOT_SIZE + (frame_bytes + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+class FrameJournal:
+    """Ham (çevrilmiş) kamera karelerini zaman damgalarıyla diske yazar
+
+    Dosya küçük bir başlık (boyut, dtype) ve ardından sabit boyutlu kayıtlardan
+    oluşur: her kayıt zaman damgası ve karenin ham baytlarıdır. Kare sayısı
+    başlığa yazılmaz, dosya boyutundan hesaplanır; böylece program
+    beklenmedik şekilde kapansa da yazılan kareler okunabilir. Kayıtlar
+    64 bayta hizalıdır, JournalSource kareleri kopyalamadan bellek eşlemeli
+    görünümler olarak döndürür.
+
+    Parametreler:
+    path -- Günlük dosyası (uzantı yoksa .twj eklenir)
+    shape -- Kare boyutu (yükseklik, genişlik, kanal)
+    dtype -- Kare veri tipi
+    """
+
+    def __init__(self, path, shape, dtype=np.uint8):
+        if not path.endswith(JOURNAL_EXTENSION):
+            path += JOURNAL_EXTENSION
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.path = path
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.frames = 0
+        frame_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        self._padding = bytes(_record_size(frame_bytes) - _SLOT_SIZE - frame_bytes)
+        self._slot = bytearray(_SLOT_SIZE)
+        height, width, channels = (self.shape + (1,))[:3]
+        header = _HEADER.pack(_MAGIC, height, width, channels, self.dtype.str.encode())
+        self._file = open(path, 'wb')
+        self._file.write(header.ljust(_HEADER_SIZE, b'\0'))
+
+    def write(self, frame, timestamp):
+        """Bir kareyi ve zaman damgasını (saniye) günlüğe ekler"""
+        if frame.shape != self.shape or frame.dtype != self.dtype:
+            raise ValueError(f"Kare boyutu {frame.shape}, beklenen {self.shape}")
+        struct.pack_into('<d', self._slot, 0, timestamp)
+        self._file.write(self._slot)
+        # Bitişik kareler kopyalanmadan dosyaya yazılır
+        self._file.write(np.ascontiguousarray(frame).data)
+        if self._padding:
+            self._file.write(self._padding)
+        self.frames += 1
+
+    def close(self):
+        """Günlüğü kapatır"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            print(f"Kare günlüğü kaydedildi: {self.path} ({self.frames} kare)")
+
+
+class JournalSource:
+    """FrameJournal dosyasını cv2.VideoCapture gibi okuyan kaynak
+
+    Dosya salt okunur olarak belleğe eşlenir; read() her kare için yeni bir
+    dizi değil, dosyadaki kaydın görünümünü döndürür (kopya ve kod çözme
+    yoktur). Kareler kayıt sırasında çevrildiği için flipped=True'dur,
+    FramePipeline onları yeniden çevirmez ve doğrudan işleme aşamasına verir.
+    Zaman damgaları ilk kareye göre CAP_PROP_POS_MSEC ile verilir, böylece
+    zamanla tarama ve kayıt FPS'i canlı oturumdaki gibi hesaplanır.
+
+    Dosya yoksa isOpened() False döner; başlığı eksik, sihirli sözcüğü,
+    veri tipi veya kare boyutu geçersizse ValueError yükseltilir.
+
+    Parametreler:
+    path -- Günlük dosyası
+    """
+
+    flipped = True  # Kareler ayna görüntüsü olarak kaydedildi
+    zero_copy = True  # read() salt okunur görünüm döndürür
+
+    def __init__(self, path):
+        self.path = path
+        self.position = 0
+        self._map = None
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return  # Dosya yok - cv2.VideoCapture gibi açılmamış kaynak
+        if size < _HEADER_SIZE:
+            raise ValueError(f"Kare günlüğü başlığı eksik ({size} bayt): {path}")
+        data = np.memmap(path, np.uint8, mode='r')
+        magic, height, width, channels, dtype = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"Geçersiz kare günlüğü: {path}")
+        try:
+            self.dtype = np.dtype(dtype.rstrip(b'\0').decode('ascii'))
+        except (TypeError, ValueError):
+            self.dtype = None
+        if self.dtype is None or self.dtype.hasobject:
+            raise ValueError(f"Kare günlüğünde geçersiz veri tipi {dtype!r}: {path}")
+        if not height or not width or not channels:
+            raise ValueError(f"Kare günlüğünde geçersiz kare boyutu {height}x{width}x{channels}: {path}")
+        self.shape = (height, width, channels) if channels > 1 else (height, width)
+        frame_bytes = height * width * channels * self.dtype.itemsize
+        record = _record_size(frame_bytes)
+        # Program yazarken kapandıysa son kayıt yarım kalmış olabilir; o kayıt okunmaz
+        count, partial = divmod(len(data) - _HEADER_SIZE, record)
+        if partial:
+            print(f"Kare günlüğünün sonundaki yarım kayıt atlandı ({partial} bayt): {path}")
+        if count:
+            strides = (record,) + np.empty(self.shape, self.dtype).strides
+            self.frames = np.ndarray((count,) + self.shape, self.dtype, buffer=data,
+                                     offset=_HEADER_SIZE + _SLOT_SIZE, strides=strides)
+            timestamps = np.ndarray((count,), '<f8', buffer=data, offset=_HEADER_SIZE, strides=(record,))
+            self.timestamps = timestamps - timestamps[0]
+        else:
+            self.frames = np.empty((0,) + self.shape, self.dtype)
+            self.timestamps = np.empty(0)
+        self._map = data
+
+    def __len__(self):
+        return len(self.frames) if self._map is not None else 0
+
+    def isOpened(self):
+        return self._map is not None
+
+    def read(self, image=None):
+        """Sıradaki karenin görünümünü döndürür (image kullanılmaz)"""
+        if self._map is None or self.position >= len(self.frames):
+            return False, None
+        frame = self.frames[self.position]
+        self.position += 1
+        return True, frame
+
+    def get(self, prop):
+        if self._map is None:
+            return 0.0
+        if prop == cv2.CAP_PROP_POS_MSEC:
+            # Son okunan karenin zaman damgası
+            return float(self.timestamps[max(self.position - 1, 0)]) * 1000.0 if len(self) else 0.0
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return float(self.position)
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return float(len(self))
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.shape[1])
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.shape[0])
+        if prop == cv2.CAP_PROP_FPS:
+            return measure_fps(self.timestamps, default=0.0)
+        return 0.0
+
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_POS_FRAMES and self._map is not None:
+            self.position = min(max(int(value), 0), len(self))
+            return True
+        return False
+
+    def release(self):
+        self.frames = self.timestamps = None
+        self._map = None
@@ -0,0 +1,213 @@
+import bisect
+import csv
+import json
+import time
+
+import cv2
+import numpy as np
+
+# Oturum histogramının kova sınırları (ms)
+HISTOGRAM_EDGES_MS = (0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+class _Stage:
+    """Tek bir aşamanın süre kayıtları
+
+    Son window ölçüm halka tamponda tutulur (kayan p50/p99 için); toplam,
+    en büyük değer ve kova sayıları bütün oturumu kapsar. Her aşama tek bir
+    iş parçacığından kaydedilir, bu yüzden kilit kullanılmaz. Nesne aynı
+    zamanda 'with' bloğu olarak kullanılır ve her seferinde yeniden kullanılır,
+    kayıt sırasında bellek ayrılmaz.
+    """
+
+    def __init__(self, name, window):
+        self.name = name
+        self.samples = np.zeros(window)
+        self.index = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(HISTOGRAM_EDGES_MS) + 1)
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.record(time.perf_counter() - self._start)
+        return False
+
+    def record(self, seconds):
+        self.samples[self.index] = seconds
+        self.index = (self.index + 1) % len(self.samples)
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[bisect.bisect_right(HISTOGRAM_EDGES_MS, seconds * 1000)] += 1
+
+    def summary(self, frames):
+        recent = self.samples[:min(self.count, len(self.samples))] * 1000
+        p50, p99 = np.percentile(recent, (50, 99)) if len(recent) else (0.0, 0.0)
+        return {
+            'count': self.count,
+            'total_ms': self.total * 1000,
+            'mean_ms': self.total / self.count * 1000 if self.count else 0.0,
+            'per_frame_ms': self.total / frames * 1000 if frames else 0.0,
+            'p50_ms': float(p50),
+            'p99_ms': float(p99),
+            'max_ms': self.max * 1000,
+            'histogram': {'edges_ms': list(HISTOGRAM_EDGES_MS), 'counts': list(self.buckets)},
+        }
+
+
+class StageMetrics:
+    """Kare işleme aşamalarının süresini ölçer
+
+    Kullanım:
+        with metrics.stage('yakalama'):
+            ret, frame = cap.read()
+
+    Her aşama için kayan pencere (son window çağrı) ve oturum boyu histogram
+    tutulur. frame() gösterilen her karede bir kez çağrılır; aşama başına
+    kare süresi (per_frame_ms) buna göre hesaplanır, böylece bir karede birden
+    fazla çalışan aşamalar (ör. çift yönlü taramada iki filtre) doğru toplanır.
+
+    Parametreler:
+    window -- Kayan yüzdelikler için tutulan son ölçüm sayısı
+    hud_interval -- HUD metninin kaç karede bir yenileneceği
+    """
+
+    def __init__(self, window=300, hud_interval=15):
+        self.window = window
+        self.hud_interval = hud_interval
+        self.frames = 0
+        self._stages = {}
+        self._started = None  # İlk karede başlar (başlangıçtaki sorular süreye girmesin)
+        self._hud_lines = []
+
+    def __bool__(self):
+        return True
+
+    def stage(self, name):
+        """Aşama süresini ölçen, yeniden kullanılan 'with' nesnesini döndürür"""
+        stage = self._stages.get(name)
+        if stage is None:
+            stage = self._stages[name] = _Stage(name, self.window)
+        return stage
+
+    def record(self, name, seconds):
+        """Dışarıda ölçülmüş bir süreyi kaydeder"""
+        self.stage(name).record(seconds)
+
+    def wrap(self, name, fn):
+        """fn çağrılarını name aşaması olarak ölçen fonksiyon döndürür"""
+        stage = self.stage(name)
+
+        def timed(*args, **kwargs):
+            with stage:
+                return fn(*args, **kwargs)
+        return timed
+
+    def frame(self):
+        """Bir karenin gösterildiğini bildirir"""
+        if self._started is None:
+            self._started = time.perf_counter()
+        self.frames += 1
+
+    def summary(self):
+        """Oturum ölçümlerini sözlük olarak döndürür"""
+        elapsed = time.perf_counter() - self._started if self._started is not None else 0.0
+        return {
+            'frames': self.frames,
+            'seconds': elapsed,
+            'fps': self.frames / elapsed if elapsed > 0 else 0.0,
+            'stages': {name: stage.summary(self.frames) for name, stage in self._stages.items()},
+        }
+
+    def draw_hud(self, image, x=20, y=70):
+        """Aşama sürelerini (kare başına ortalama, p99) görüntünün üzerine yazar
+
+        Metin hud_interval karede bir yeniden hesaplanır, arada yalnızca çizilir.
+        """
+        if self.frames % self.hud_interval == 1 or not self._hud_lines:
+            summary = self.summary()
+            self._hud_lines = [f"{summary['fps']:.1f} FPS"] + [
+                f"{name}: {s['per_frame_ms']:.2f} ms (p99 {s['p99_ms']:.2f})"
+                for name, s in summary['stages'].items()]
+        for i, line in enumerate(self._hud_lines):
+            cv2.putText(image, line, (x, y + i * 18), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 255, 255), 1)
+
+    def save(self, path):
+        """Ölçümleri uzantıya göre JSON ya da CSV olarak kaydeder
+
+        JSON bütün özeti (histogramlar dahil) içerir; CSV aşama başına bir satırdır.
+        """
+        summary = self.summary()
+        if path.lower().endswith('.csv'):
+            fields = ['stage', 'count', 'total_ms', 'mean_ms', 'per_frame_ms', 'p50_ms', 'p99_ms', 'max_ms']
+            with open(path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fields, extrasaction='ignore')
+                writer.writeheader()
+                for name, stage in summary['stages'].items():
+                    writer.writerow(dict(stage, stage=name))
+        else:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(summary, f, indent=2, ensure_ascii=False)
+
+
+def report_metrics(metrics, path=None):
+    """Oturum sonunda aşama sürelerini yazar, path verildiyse dosyaya kaydeder
+
+    Ölçüm kapalıysa (NullMetrics veya None) hiçbir şey yapmaz.
+    """
+    if not metrics:
+        return
+    summary = metrics.summary()
+    print(f"Aşama süreleri ({summary['frames']} kare, {summary['fps']:.1f} FPS) - kare başına ortalama / p99:")
+    for name, stage in summary['stages'].items():
+        print(f"  {name:<10}{stage['per_frame_ms']:>8.2f} ms{stage['p99_ms']:>8.2f} ms")
+    if path:
+        metrics.save(path)
+        print(f"Ölçümler kaydedildi: {path}")
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class NullMetrics:
+    """Ölçüm kapalıyken kullanılan, hiçbir şey yapmayan StageMetrics karşılığı
+
+    stage() her zaman aynı boş 'with' nesnesini, wrap() fonksiyonun kendisini
+    döndürür; böylece kapalı ölçümün maliyeti bir metot çağrısından ibarettir.
+    """
+
+    _stage = _NullStage()
+    frames = 0
+
+    def __bool__(self):
+        return False
+
+    def stage(self, name):
+        return self._stage
+
+    def record(self, name, seconds):
+        pass
+
+    def wrap(self, name, fn):
+        return fn
+
+    def frame(self):
+        pass
+
+    def draw_hud(self, image, x=20, y=70):
+        pass
+
+
+NULL_METRICS = NullMetrics()
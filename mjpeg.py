@@ -0,0 +1,175 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+
+# multipart/x-mixed-replace parça sınırı
+BOUNDARY = 'twframe'
+
+_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title></head>
+<body style="margin:0;background:#000"><img src="/stream" style="display:block;margin:auto;max-width:100%"></body>
+</html>
+"""
+
+
+class MJPEGServer:
+    """İşlenmiş kareleri yerel HTTP üzerinden MJPEG akışı olarak yayınlar
+
+    publish() her kareyi bir kez JPEG'e kodlar ve çok parçalı yanıtın parçası
+    olarak hazırlar; bağlı bütün istemciler aynı bayt dizisini gönderir, bu
+    yüzden kodlama maliyeti istemci sayısından bağımsızdır. Hiç istemci yoksa
+    kodlama yapılmaz. Her istemci kendi iş parçacığında yalnızca en son kareyi
+    gönderir: yavaş istemci arada yayınlanan kareleri atlar, publish() hiçbir
+    zaman istemciyi beklemez.
+
+    Adresler: / (izleme sayfası), /stream (MJPEG akışı), /snapshot.jpg (sıradaki kare)
+
+    Parametreler:
+    port -- Dinlenecek port (0 ise boş bir port seçilir)
+    host -- Dinlenecek adres (varsayılan yalnızca bu makine)
+    quality -- JPEG kalitesi (0-100)
+    title -- İzleme sayfasının başlığı
+    """
+
+    def __init__(self, port=8080, host='127.0.0.1', quality=80, title='Time Warp'):
+        self.quality = quality
+        self.title = title
+        self.encoded = 0  # Kodlanan kare sayısı
+        self.sent = 0  # İstemcilere gönderilen toplam kare sayısı
+        self.skipped = 0  # Yavaş istemcilerin atladığı toplam kare sayısı
+        self._clients = 0
+        self._part = None  # Son karenin hazır çok parçalı yanıt parçası
+        self._jpeg = None  # Son karenin JPEG baytları
+        self._sequence = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="MJPEGServer", daemon=True)
+        self._thread.start()
+
+    @property
+    def address(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    @property
+    def clients(self):
+        """Bağlı akış istemcisi sayısı"""
+        return self._clients
+
+    def publish(self, frame):
+        """Kareyi yayınlar (izleyen yoksa kodlamadan döner)
+
+        Kare çağrıdan sonra değiştirilebilir; kodlanmış kopyası saklanır.
+        """
+        if not self._clients:
+            return
+        ok, jpeg = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ok:
+            return
+        jpeg = jpeg.tobytes()
+        header = (f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                  f"Content-Length: {len(jpeg)}\r\n\r\n").encode()
+        part = b''.join((header, jpeg, b'\r\n'))
+        with self._cond:
+            self._jpeg = jpeg
+            self._part = part
+            self._sequence += 1
+            self.encoded += 1
+            self._cond.notify_all()
+
+    def close(self):
+        """Sunucuyu durdurur ve istemci bağlantılarını bitirir"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        print(f"MJPEG yayını kapatıldı: {self.encoded} kare kodlandı, {self.sent} gönderildi, "
+              f"{self.skipped} atlandı")
+
+    def _next_frame(self, last, timeout=None):
+        # last'tan sonra yayınlanan en son kareyi bekler (kapanışta veya zaman aşımında None)
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._closed or self._sequence != last, timeout) or self._closed:
+                return None, None, last
+            self.skipped += self._sequence - last - 1
+            self.sent += 1
+            return self._part, self._jpeg, self._sequence
+
+    def _watch(self):
+        # İstemciyi kaydeder; publish() ancak izleyen varken kodlar.
+        # Bağlanan istemci eldeki eski kareyi değil, sıradaki kareyi bekler.
+        with self._cond:
+            self._clients += 1
+            return self._sequence
+
+    def _unwatch(self):
+        with self._cond:
+            self._clients -= 1
+
+    def _stream(self, handler):
+        handler.send_response(200)
+        handler.send_header('Content-Type', f'multipart/x-mixed-replace; boundary={BOUNDARY}')
+        handler.send_header('Cache-Control', 'no-cache, no-store')
+        handler.send_header('Connection', 'close')
+        handler.end_headers()
+        last = self._watch()
+        try:
+            while True:
+                part, _, last = self._next_frame(last)
+                if part is None:
+                    break
+                handler.wfile.write(part)
+                handler.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError, TimeoutError):
+            pass  # İstemci ayrıldı
+        finally:
+            self._unwatch()
+
+    def _snapshot(self):
+        # Tek kare isteyen istemci de sıradaki karenin kodlanmasını bekler
+        last = self._watch()
+        try:
+            return self._next_frame(last, timeout=5.0)[1]
+        finally:
+            self._unwatch()
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Gönderimde takılan (ağı kopan) istemci iş parçacığı sonsuza kadar beklemesin
+            timeout = 10
+
+            def do_GET(self):
+                path = self.path.split('?', 1)[0]
+                if path == '/stream':
+                    server._stream(self)
+                elif path == '/snapshot.jpg':
+                    jpeg = server._snapshot()
+                    if jpeg is None:
+                        self.send_error(503)
+                    else:
+                        self._send(jpeg, 'image/jpeg')
+                elif path == '/':
+                    self._send(_PAGE.format(title=server.title).encode(), 'text/html; charset=utf-8')
+                else:
+                    self.send_error(404)
+
+            def _send(self, body, content_type):
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('Cache-Control', 'no-cache, no-store')
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # İstek günlüğü konsolu doldurmasın
+
+        return Handler
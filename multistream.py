@@ -0,0 +1,308 @@
+import argparse
+import heapq
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from disbukey import MirrorRenderer, distortion_strength
+from encoders import ENCODER_BACKENDS, FFmpegEncoder, create_encoder, encoder_extension
+from pipeline import open_source, source_timestamp
+from scanner import TimeWarpScanner
+
+# Desteklenen efektler
+EFFECTS = ('scan', 'mirror')
+
+
+class StreamSession:
+    """Çoklu akış çalıştırıcısında tek bir akış: kaynak, efekt motoru ve çıktı
+
+    Kareler için gereken tamponlar ilk karede bir kez ayrılır. Aynı çözünürlük
+    ve parametrelerdeki ayna oturumları dışbükey haritaları ve kaplama
+    katmanını disbukey modülünün önbelleklerinden paylaşır; filtrelerin ara
+    tamponları iş parçacığına özeldir. Böylece oturumlar ortak iş
+    parçacığı havuzunda güvenle işlenir. Bir oturumun step() çağrıları hiçbir
+    zaman eşzamanlı yapılmaz.
+
+    Parametreler:
+    name -- Akışın adı (rapor ve çıktı dosyası için)
+    source -- Kamera indeksi, video dosyası, kare günlüğü veya read()/get() destekleyen kaynak nesnesi
+    effect -- 'scan' (Time Warp Scan) veya 'mirror' (dışbükey ayna)
+    fps -- Hedef FPS; None ise kaynak izin verdiği kadar hızlı işlenir
+    direction, filter_type, scan_speed, sweep_seconds -- Tarama ayarları
+    strength -- Ayna etki gücü
+    output -- Verilirse sonuç kareleri bu dosyaya kodlanır
+    encoder, codec -- Çıktı kodlayıcısı
+    on_frame -- Verilirse her sonuç karesiyle on_frame(session, frame, timestamp) çağrılır
+                (işçi iş parçacığında; kare yalnızca çağrı süresince geçerlidir)
+    max_frames -- Verilirse bu kadar kareden sonra akış biter
+    """
+
+    def __init__(self, name, source, effect='scan', fps=None, direction='1', filter_type=0, scan_speed=2,
+                 sweep_seconds=None, strength=distortion_strength, output=None, encoder='opencv', codec=None,
+                 on_frame=None, max_frames=None):
+        if effect not in EFFECTS:
+            raise ValueError(f"Bilinmeyen efekt: {effect}")
+        self.name = name
+        self.effect = effect
+        self.fps = fps
+        self.settings = {'direction': direction, 'filter_type': filter_type, 'scan_speed': scan_speed,
+                         'sweep_seconds': sweep_seconds, 'strength': strength}
+        self.output = output
+        self.on_frame = on_frame
+        self.max_frames = max_frames
+        self.frames = 0
+        self.busy_seconds = 0.0  # step() içinde geçen toplam süre
+        self.error = None
+        if hasattr(source, 'read'):
+            self.cap, self.live = source, False
+        else:
+            self.cap, self.live = open_source(source)
+        self._writer = create_encoder(encoder, codec) if output else None
+        self.engine = None
+        self._raw = None
+        self._frame = None
+        self._out = None
+
+    def _setup(self, first):
+        # İlk kareye göre efekt motorunu ve tamponları hazırla
+        height, width = first.shape[:2]
+        s = self.settings
+        if self.effect == 'scan':
+            self.engine = TimeWarpScanner(width, height, s['direction'], s['filter_type'], s['scan_speed'],
+                                          s['sweep_seconds'])
+        else:
+            self.engine = MirrorRenderer(width, height, s['strength'])
+        self._frame = np.empty_like(first)
+        self._out = np.empty_like(first)
+        if self._writer is not None:
+            fps = self.fps or self.cap.get(cv2.CAP_PROP_FPS) or 20.0
+            output_dir = os.path.dirname(self.output)
+            if output_dir and not os.path.exists(output_dir):
+                os.makedirs(output_dir)
+            self._writer.open(self.output, width, height, fps)
+
+    def step(self):
+        """Bir kare okur, işler ve çıktıya verir
+
+        Dönüş:
+        Akış devam ediyorsa True, bittiyse False
+        """
+        if self.max_frames is not None and self.frames >= self.max_frames:
+            return False
+        start = time.perf_counter()
+        ret, raw = self.cap.read(self._raw)
+        if not ret:
+            return False
+        timestamp = source_timestamp(self.cap, self.live)
+        if self.engine is None:
+            self._setup(raw)
+        if getattr(self.cap, 'zero_copy', False):
+            frame = raw  # Kare günlüğü: zaten çevrilmiş, salt okunur görünüm
+        else:
+            self._raw = raw
+            frame = self._frame
+            cv2.flip(raw, 1, dst=frame)
+        if self.effect == 'scan':
+            result = self.engine.step(frame, self._out, timestamp)
+        else:
+            result = self.engine.render(frame, self._out)
+        if self._writer is not None:
+            self._writer.write(result)
+        if self.on_frame is not None:
+            self.on_frame(self, result, timestamp)
+        self.frames += 1
+        self.busy_seconds += time.perf_counter() - start
+        return True
+
+    def close(self):
+        """Kaynağı, motoru ve çıktıyı kapatır"""
+        if self._writer is not None:
+            self._writer.close()
+        if self.effect == 'mirror' and self.engine is not None:
+            self.engine.close()
+        self.cap.release()
+
+
+class MultiStreamRunner:
+    """Birden çok akışı tek süreçte ortak bir iş parçacığı havuzuyla çalıştırır
+
+    Her akışın kare işi (okuma, çevirme, efekt, kodlama) havuzdaki bir işçide
+    çalışır; bir akışın aynı anda en fazla bir karesi işlenir, böylece akış
+    durumu kilit gerektirmez. Zamanlama en erken vade önce (EDF) kuralıyla
+    yapılır: hedef FPS'li akışın sıradaki karesinin vadesi sabit aralıklarla
+    ilerler, hedefsiz akışın vadesi önceki karesinin bittiği andır. Boşalan
+    işçi vadesi en eski hazır akışı kendisi alır; bu yüzden yük altında hiçbir akış
+    aç kalmaz ve hedefsiz akışlar sırayla eşit pay alır. Hedefine bir
+    aralıktan fazla geride kalan akış kaçırdığı kareleri telafi etmeye
+    çalışmaz, vadesi şimdiye çekilir.
+
+    OpenCV işlemleri GIL'i bıraktığından işçiler gerçekten paralel çalışır.
+
+    Parametreler:
+    sessions -- StreamSession listesi
+    workers -- İşçi sayısı (varsayılan: CPU sayısı)
+    """
+
+    def __init__(self, sessions, workers=None):
+        self.sessions = list(sessions)
+        self.workers = workers or os.cpu_count() or 1
+        self.seconds = 0.0
+        self._cond = threading.Condition()
+        self._stop = False
+
+    @property
+    def frames(self):
+        """Bütün akışlarda işlenen toplam kare sayısı"""
+        return sum(session.frames for session in self.sessions)
+
+    def stop(self):
+        """Çalışmayı başka bir iş parçacığından durdurur (işlenen kareler biter)"""
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+
+    def run(self, duration=None):
+        """Akışlar bitene, duration saniye geçene veya stop() çağrılana kadar çalışır"""
+        start = time.perf_counter()
+        deadline = start + duration if duration else None
+        # Hazır (işlenmekte olmayan) akışlar vadeye göre yığında tutulur
+        ready = [(start, i, session) for i, session in enumerate(self.sessions)]
+        state = {'active': len(self.sessions)}
+
+        def worker():
+            # Her işçi sıradaki akışı kendisi seçer; ayrı bir zamanlayıcı
+            # iş parçacığına gidip gelme (kare başına iki bağlam geçişi) olmaz
+            with self._cond:
+                while state['active'] and not self._stop:
+                    now = time.perf_counter()
+                    if deadline is not None and now >= deadline:
+                        break
+                    if not ready or ready[0][0] > now:
+                        # En yakın vadeye, bir akışın işi bitene veya süre sonuna kadar bekle
+                        timeout = ready[0][0] - now if ready else None
+                        if deadline is not None:
+                            timeout = min(timeout, deadline - now) if timeout is not None else deadline - now
+                        self._cond.wait(timeout)
+                        continue
+                    due, i, session = heapq.heappop(ready)
+                    self._cond.release()
+                    try:
+                        more = session.step()
+                    except Exception as e:
+                        session.error = e
+                        more = False
+                    finally:
+                        self._cond.acquire()
+                    if more:
+                        now = time.perf_counter()
+                        if session.fps:
+                            period = 1.0 / session.fps
+                            due = max(due + period, now)
+                        else:
+                            due = now
+                        heapq.heappush(ready, (due, i, session))
+                    else:
+                        state['active'] -= 1
+                    # Bekleyen işçiler yeni vadeyi veya bitişi görsün
+                    self._cond.notify_all()
+                self._cond.notify_all()
+
+        with ThreadPoolExecutor(self.workers, thread_name_prefix="MultiStream") as pool:
+            futures = [pool.submit(worker) for _ in range(min(self.workers, len(self.sessions)))]
+            try:
+                for future in futures:
+                    future.result()
+            except KeyboardInterrupt:
+                print("Durduruluyor...")
+                self.stop()
+        self.seconds = time.perf_counter() - start
+        for session in self.sessions:
+            session.close()
+            if session.error is not None:
+                print(f"{session.name}: hata - {session.error}")
+        return self.summary()
+
+    def summary(self):
+        """Akış başına ve toplam kare/FPS bilgisi"""
+        seconds = self.seconds
+        return {
+            'streams': len(self.sessions),
+            'workers': self.workers,
+            'frames': self.frames,
+            'seconds': seconds,
+            'fps': self.frames / seconds if seconds > 0 else 0.0,
+            'per_stream': {s.name: {'frames': s.frames, 'fps': s.frames / seconds if seconds > 0 else 0.0,
+                                    'target_fps': s.fps,
+                                    'ms_per_frame': s.busy_seconds / s.frames * 1000 if s.frames else 0.0}
+                           for s in self.sessions},
+        }
+
+
+def parse_stream(spec):
+    """'efekt:kaynak[@fps]' biçimindeki akış tanımını (efekt, kaynak, fps) olarak ayırır"""
+    effect, _, rest = spec.partition(':')
+    if effect not in EFFECTS or not rest:
+        raise argparse.ArgumentTypeError(f"Akış 'scan:kaynak' veya 'mirror:kaynak[@fps]' biçiminde olmalı: {spec}")
+    source, _, fps = rest.rpartition('@') if '@' in rest else (rest, '', '')
+    return effect, source, float(fps) if fps else None
+
+
+def main(argv=None):
+    """Birden çok kamera/dosya akışını tek süreçte işler"""
+    parser = argparse.ArgumentParser(description="Çoklu akış çalıştırıcısı (Time Warp Scan ve dışbükey ayna)")
+    parser.add_argument('streams', nargs='+', type=parse_stream,
+                        help="Akışlar: scan:KAYNAK veya mirror:KAYNAK, isteğe bağlı @FPS (ör. scan:0@30)")
+    parser.add_argument('--workers', type=int, help="Ortak işçi sayısı (varsayılan: CPU sayısı)")
+    parser.add_argument('--fps', type=float, help="Hedef FPS'i verilmeyen akışlar için hedef")
+    parser.add_argument('--duration', type=float, help="En fazla çalışma süresi (saniye)")
+    parser.add_argument('--direction', choices=['1', '2', '3'], default='1', help="Tarama yönü")
+    parser.add_argument('--filter', type=int, choices=range(6), default=0, help="Filtre tipi (0-5)")
+    parser.add_argument('--sweep-seconds', type=float, help="Taramayı zamanla ilerlet (bir eksenin süresi)")
+    parser.add_argument('--output-dir', help="Verilirse her akışın sonucu bu klasöre kaydedilir")
+    parser.add_argument('--encoder', choices=ENCODER_BACKENDS, default='opencv', help="Çıktı kodlayıcısı")
+    parser.add_argument('--codec', help="Kodlayıcı codec'i")
+    args = parser.parse_args(argv)
+
+    if args.encoder == 'ffmpeg' and not FFmpegEncoder.available():
+        print("ffmpeg bulunamadı! Kurun veya --encoder opencv kullanın.")
+        return
+
+    # Paralellik akışlar arasında; OpenCV'nin kendi iş parçacıkları işçilerle yarışmasın
+    cv2.setNumThreads(1)
+
+    sessions = []
+    ready = False
+    try:
+        for i, (effect, source, fps) in enumerate(args.streams):
+            name = f"{i}_{effect}"
+            output = None
+            if args.output_dir:
+                output = os.path.join(args.output_dir, name + encoder_extension(args.encoder))
+            session = StreamSession(name, source, effect, fps or args.fps, args.direction, args.filter,
+                                    sweep_seconds=args.sweep_seconds, output=output, encoder=args.encoder,
+                                    codec=args.codec)
+            sessions.append(session)
+            if not session.cap.isOpened():
+                print(f"Kaynak açılamadı: {source}")
+                return
+        ready = True
+    finally:
+        # Bir kaynak açılamazsa önceden açılanlar da bırakılır (çalışınca run() kapatır)
+        if not ready:
+            for session in sessions:
+                session.close()
+
+    summary = MultiStreamRunner(sessions, args.workers).run(args.duration)
+    for name, stats in summary['per_stream'].items():
+        target = f" (hedef {stats['target_fps']:.0f})" if stats['target_fps'] else ""
+        print(f"{name}: {stats['frames']} kare, {stats['fps']:.1f} FPS{target}, {stats['ms_per_frame']:.2f} ms/kare")
+    print(f"Toplam: {summary['streams']} akış, {summary['workers']} işçi, {summary['frames']} kare, "
+          f"{summary['seconds']:.2f} sn, {summary['fps']:.1f} FPS")
+
+
+if __name__ == "__main__":
+    main()
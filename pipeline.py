@@ -0,0 +1,249 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from frame_queue import BoundedFrameQueue, FramePool, QueueClosed
+from journal import JOURNAL_EXTENSION, FrameJournal, JournalSource
+from metrics import NULL_METRICS
+
+
+def open_source(source):
+    """Kamera indeksi, video dosyası ya da kare günlüğü (.twj) için kaynak açar
+
+    Parametreler:
+    source -- Kamera indeksi (int veya "0" gibi rakamlardan oluşan metin) ya da dosya yolu
+
+    Dönüş:
+    (cap, live) - live kaynağın canlı kamera olup olmadığını belirtir
+    """
+    if isinstance(source, int) or (isinstance(source, str) and source.isdigit()):
+        return cv2.VideoCapture(int(source)), True
+    if source.endswith(JOURNAL_EXTENSION):
+        return JournalSource(source), False
+    return cv2.VideoCapture(source), False
+
+
+def source_timestamp(source, live):
+    """Son okunan karenin zaman damgası (saniye)
+
+    Canlı kaynakta okuma anı, dosya kaynağında sunum zaman damgası kullanılır
+    (tekrarlanabilir).
+    """
+    if live:
+        return time.monotonic()
+    return source.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+
+
+def scaled_size(width, height, scale):
+    """(width, height) boyutunun scale ile çarpılmış hali (en az 1 piksel)"""
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def open_journal(path, source, live, first):
+    """Ham kare günlüğünü açar ve boyutları öğrenmek için okunan ilk kareyi yazar
+
+    İlk kare efekt döngüsüne girmez ama günlüğe yazılır; tekrar oynatmada
+    yine boyut için tüketilir ve efekt aynı karelerle başlar.
+
+    Parametreler:
+    path -- Günlük dosyası
+    source -- first karesinin okunduğu kaynak
+    live -- Kaynak canlı kamera mı?
+    first -- Kaynaktan okunan (çevrilmemiş) ilk kare
+    """
+    journal = FrameJournal(path, first.shape, first.dtype)
+    if not getattr(source, 'flipped', False):
+        first = cv2.flip(first, 1)
+    journal.write(first, source_timestamp(source, live))
+    return journal
+
+
+class FramePipeline:
+    """Yakalama -> işleme -> gösterim aşamalarını ayrı iş parçacıklarında çalıştırır
+
+    Yakalama ve işleme aşamaları arka plan iş parçacıklarıdır ve sınırlı
+    kuyruklarla birbirine bağlıdır; gösterim (imshow/waitKey, kayıt) frames()
+    üzerinden çağıranın iş parçacığında yapılır. Böylece kamera G/Ç gecikmesi
+    işleme süresine eklenmez. Canlı kaynakta varsayılan 'drop_oldest'
+    politikası her zaman en taze karenin işlenmesini sağlar; dosya kaynağında
+    hiçbir kare atılmaz ('block').
+
+    threaded=False verilirse aynı arayüz tek iş parçacığında sırayla çalışır.
+
+    Parametreler:
+    source -- read(image) ve get(prop) destekleyen kaynak (ör. cv2.VideoCapture)
+    process -- process(frame, out, timestamp) fonksiyonu; sonucu out içine yazıp out döndürür
+    live -- Kaynak canlı kamera mı? (zaman damgası ve varsayılan politika için)
+    threaded -- Aşamalar ayrı iş parçacıklarında mı çalışsın?
+    queue_size -- Aşamalar arası kuyruk boyutu (kare)
+    policy -- Kuyruk dolunca davranış; None ise live değerine göre seçilir
+    flip -- Yakalanan kare yatay çevrilsin mi (ayna görüntüsü)? Kaynak
+            flipped=True bildiriyorsa (kare günlüğü) kare yeniden çevrilmez.
+    metrics -- Aşama sürelerinin kaydedileceği StageMetrics ('yakalama',
+               'çevirme', 'ölçekleme', 'günlük', 'işleme'); None ise ölçüm yapılmaz
+    journal -- Verilirse yakalanan (çevrilmiş) her kare bu FrameJournal'a yazılır
+    size -- Verilirse kareler yakalamada bu (genişlik, yükseklik) boyutuna
+            küçültülür; işleme ve gösterim bu boyutta yapılır. Günlüğe yine
+            kaynak çözünürlüğündeki kareler yazılır.
+
+    Kaynak zero_copy=True bildiriyorsa, çevirme ve küçültme gerekmiyorsa
+    okunan kare havuza kopyalanmadan işleme aşamasına verilir.
+    """
+
+    def __init__(self, source, process, live=True, threaded=True, queue_size=2, policy=None, flip=True,
+                 metrics=None, journal=None, size=None):
+        self.source = source
+        self.process = process
+        self.live = live
+        self.threaded = threaded
+        self.flip = flip and not getattr(source, 'flipped', False)
+        self.metrics = metrics or NULL_METRICS
+        self.journal = journal
+        self.size = tuple(size) if size is not None else None
+        self._zero_copy = not self.flip and self.size is None and getattr(source, 'zero_copy', False)
+        self._flipped = None  # Günlük için tam çözünürlükte çevrilmiş kare (yakalama iş parçacığına ait)
+        if policy is None:
+            policy = 'drop_oldest' if live else 'block'
+        self.frames_captured = 0
+        self.frames_processed = 0
+        # İki kuyruk + her aşamada tutulan tamponlar kadar havuz yeterlidir
+        self._pool = FramePool(2 * queue_size + 4)
+        self._captured = BoundedFrameQueue(queue_size, policy, on_drop=self._on_drop_captured)
+        self._processed = BoundedFrameQueue(queue_size, policy, on_drop=self._on_drop)
+        self._stop = threading.Event()
+        self._threads = []
+        self._error = None
+
+    @property
+    def frames_dropped(self):
+        """Kuyruk politikası nedeniyle atılan toplam kare sayısı"""
+        return self._captured.dropped + self._processed.dropped
+
+    def frames(self):
+        """İşlenmiş kareleri (sonuç, zaman damgası) olarak sırayla döndürür
+
+        Gösterilen kare işi bitince release() ile havuza iade edilmelidir.
+        """
+        if not self.threaded:
+            yield from self._serial_frames()
+            return
+
+        self._start()
+        while True:
+            try:
+                item = self._processed.get()
+            except QueueClosed:
+                break
+            yield item
+        if self._error is not None:
+            raise self._error
+
+    def release(self, frame):
+        """Gösterimi biten kare tamponunu havuza iade eder"""
+        self._pool.release(frame)
+
+    def stop(self):
+        """Aşamaları durdurur ve iş parçacıklarının bitmesini bekler"""
+        self._stop.set()
+        self._captured.close()
+        self._processed.close()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _start(self):
+        for target, name in ((self._capture_loop, 'capture'), (self._process_loop, 'process')):
+            thread = threading.Thread(target=target, name=f"FramePipeline-{name}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _on_drop(self, item):
+        # Atılan karenin tamponunu havuza iade et
+        self._pool.release(item[0])
+
+    def _on_drop_captured(self, item):
+        # Kopyasız kaynağın kareleri havuza ait değildir
+        if not self._zero_copy:
+            self._pool.release(item[0])
+
+    def _capture(self, raw):
+        # Kaynaktan bir kare okuyup havuzdan alınan tampona (gerekirse çevirerek) yazar
+        with self.metrics.stage('yakalama'):
+            ret, raw = self.source.read(raw)
+        if not ret:
+            return raw, None, None
+        timestamp = source_timestamp(self.source, self.live)
+        captured = frame = raw
+        if self.size is not None:
+            frame = self._pool.acquire((self.size[1], self.size[0]) + raw.shape[2:], raw.dtype)
+            with self.metrics.stage('ölçekleme'):
+                if self.flip and self.journal is not None:
+                    # Günlük tam çözünürlüklü çevrilmiş kareyi ister
+                    captured = self._flipped = cv2.flip(raw, 1, dst=self._flipped)
+                    cv2.resize(captured, self.size, dst=frame, interpolation=cv2.INTER_AREA)
+                else:
+                    # Önce küçültülür, küçük kare yerinde çevrilir
+                    cv2.resize(raw, self.size, dst=frame, interpolation=cv2.INTER_AREA)
+                    if self.flip:
+                        cv2.flip(frame, 1, dst=frame)
+        elif not self._zero_copy:
+            captured = frame = self._pool.acquire(raw.shape, raw.dtype)
+            with self.metrics.stage('çevirme'):
+                if self.flip:
+                    cv2.flip(raw, 1, dst=frame)
+                else:
+                    np.copyto(frame, raw)
+        if self.journal is not None:
+            with self.metrics.stage('günlük'):
+                self.journal.write(captured, timestamp)
+        self.frames_captured += 1
+        return raw, frame, timestamp
+
+    def _run_process(self, frame, timestamp):
+        out = self._pool.acquire(frame.shape, frame.dtype)
+        with self.metrics.stage('işleme'):
+            result = self.process(frame, out, timestamp)
+        if not self._zero_copy:
+            self._pool.release(frame)
+        self.frames_processed += 1
+        return result
+
+    def _serial_frames(self):
+        raw = None
+        while not self._stop.is_set():
+            raw, frame, timestamp = self._capture(raw)
+            if frame is None:
+                break
+            yield self._run_process(frame, timestamp), timestamp
+
+    def _capture_loop(self):
+        raw = None
+        try:
+            while not self._stop.is_set():
+                raw, frame, timestamp = self._capture(raw)
+                if frame is None:
+                    break
+                self._captured.put((frame, timestamp))
+        except QueueClosed:
+            pass
+        except Exception as e:
+            self._error = e
+        finally:
+            self._captured.close()
+
+    def _process_loop(self):
+        try:
+            while not self._stop.is_set():
+                try:
+                    frame, timestamp = self._captured.get()
+                except QueueClosed:
+                    break
+                self._processed.put((self._run_process(frame, timestamp), timestamp))
+        except QueueClosed:
+            pass
+        except Exception as e:
+            self._error = e
+        finally:
+            self._processed.close()
@@ -0,0 +1,192 @@
+import argparse
+import bisect
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from recordings import VIDEO_EXTENSIONS
+
+# Önizleme dosyası videonun yanında <video>.thumb.jpg adıyla tutulur
+THUMBNAIL_SUFFIX = '.thumb.jpg'
+
+# OpenCV (FFmpeg arka ucu) konumlanırken hedefin bu kadar kare gerisine atlar,
+# oradan önceki anahtar kareye döner ve hedefe kadar çözer
+SEEK_BACKOFF = 16
+# Konumlanmanın sabit maliyeti (çözülen kare cinsinden, ölçülmüş)
+SEEK_OVERHEAD = 4
+# Anahtar kareler bilinmiyorsa varsayılan konumlanma maliyeti
+DEFAULT_SEEK_COST = 24
+
+
+def keyframe_indices(path):
+    """Videodaki anahtar karelerin indekslerini kareleri çözmeden bulur
+
+    Dosya ham paket modunda ayrıca açılır ve yalnızca paket başlıkları okunur
+    (ham moddan çözme moduna geri dönülemiyor). Arka uç bunu desteklemiyorsa
+    None döner.
+    """
+    cap = cv2.VideoCapture(path)
+    try:
+        if not cap.isOpened() or not cap.set(cv2.CAP_PROP_FORMAT, -1):
+            return None
+        keys = []
+        index = 0
+        while cap.grab():
+            if cap.get(cv2.CAP_PROP_LRF_HAS_KEY_FRAME):
+                keys.append(index)
+            index += 1
+        return keys or None
+    finally:
+        cap.release()
+
+
+def seek_cost(target, keyframes):
+    """target karesine konumlanmanın yaklaşık maliyeti (çözülen kare sayısı)"""
+    if not keyframes:
+        return DEFAULT_SEEK_COST
+    start = max(target - SEEK_BACKOFF, 0)
+    key = keyframes[max(bisect.bisect_right(keyframes, start) - 1, 0)]
+    return target - key + SEEK_OVERHEAD
+
+
+def sample_frames(path, count=9):
+    """Videodan count adet eşit aralıklı kareyi baştan çözmeden okur
+
+    Her hedef için anahtar kare konumlarına göre daha ucuz yol seçilir:
+    hedef yakınsa aradaki kareler grab() ile atlanır, uzaksa konumlanılır
+    (konumlanma önceki anahtar kareden itibaren çözer). Okunan kareler tam
+    olarak hedef karelerdir.
+
+    Parametreler:
+    path -- Video dosyası
+    count -- Örnek kare sayısı
+
+    Dönüş:
+    (kare indeksi, kare) listesi ve FPS; açılamazsa (None, 0)
+    """
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        return None, 0
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        if frame_count <= 0:
+            return [], fps
+        keyframes = keyframe_indices(path)
+        samples = []
+        position = 0
+        for index in sorted(set(int(round(t)) for t in np.linspace(0, frame_count - 1, count))):
+            if index - position > seek_cost(index, keyframes):
+                cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+            else:
+                while position < index and cap.grab():
+                    position += 1
+            ok, frame = cap.read()
+            if not ok:
+                break
+            samples.append((index, frame))
+            position = index + 1
+        return samples, fps
+    finally:
+        cap.release()
+
+
+def contact_sheet(samples, fps, thumb_width=160, columns=None):
+    """Örnek kareleri zaman etiketli tek bir ızgara görüntüsünde birleştirir"""
+    if not samples:
+        return None
+    columns = columns or math.ceil(math.sqrt(len(samples)))
+    rows = math.ceil(len(samples) / columns)
+    height, width = samples[0][1].shape[:2]
+    thumb_height = max(1, round(height * thumb_width / width))
+    sheet = np.zeros((rows * thumb_height, columns * thumb_width, 3), np.uint8)
+    for i, (index, frame) in enumerate(samples):
+        y, x = (i // columns) * thumb_height, (i % columns) * thumb_width
+        cell = sheet[y:y + thumb_height, x:x + thumb_width]
+        cv2.resize(frame, (thumb_width, thumb_height), dst=cell, interpolation=cv2.INTER_AREA)
+        label = f"{index / fps:.1f} sn" if fps else f"#{index}"
+        cv2.putText(cell, label, (4, thumb_height - 6), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
+    return sheet
+
+
+def thumbnail_path(video_path):
+    return video_path + THUMBNAIL_SUFFIX
+
+
+def thumbnail(video_path, count=9, thumb_width=160, force=False):
+    """Videonun önizleme görüntüsünü üretir veya önbellekten döndürür
+
+    Önizleme videonun yanına yazılır ve değiştirilme zamanı videonunkine
+    eşitlenir; video değişince (mtime farklıysa) yeniden üretilir.
+
+    Dönüş:
+    (önizleme yolu, önbellekten mi) ya da video okunamazsa (None, False)
+    """
+    path = thumbnail_path(video_path)
+    mtime = os.stat(video_path).st_mtime
+    if not force and os.path.exists(path) and os.stat(path).st_mtime == mtime:
+        return path, True
+    samples, fps = sample_frames(video_path, count)
+    sheet = contact_sheet(samples, fps, thumb_width)
+    if sheet is None:
+        return None, False
+    # Yarım yazılmış önizleme geçerli sayılmasın diye geçici adla yazılır
+    temp_path = os.path.join(os.path.dirname(path), '.' + os.path.basename(path))
+    cv2.imwrite(temp_path, sheet, [cv2.IMWRITE_JPEG_QUALITY, 85])
+    os.utime(temp_path, (mtime, mtime))
+    os.replace(temp_path, path)
+    return path, False
+
+
+def thumbnails(video_paths, count=9, thumb_width=160, workers=None, force=False):
+    """Birden çok videonun önizlemelerini paralel üretir
+
+    Çözme ve kodlama OpenCV içinde GIL bırakılarak yapıldığından iş
+    parçacıkları yeterlidir; süreç başlatma maliyeti yoktur.
+
+    Dönüş:
+    {video yolu: önizleme yolu veya None} ve önbellekten gelen sayısı
+    """
+    workers = workers or os.cpu_count() or 1
+    with ThreadPoolExecutor(workers) as pool:
+        results = list(pool.map(lambda p: thumbnail(p, count, thumb_width, force), video_paths))
+    cached = sum(1 for _, hit in results if hit)
+    return {video: path for video, (path, _) in zip(video_paths, results)}, cached
+
+
+def find_videos(directory):
+    """Klasördeki kayıtlı videolar (yazılmakta olan geçici çekimler hariç)"""
+    return sorted(entry.path for entry in os.scandir(directory)
+                  if entry.is_file() and not entry.name.startswith('.')
+                  and os.path.splitext(entry.name)[1].lower() in VIDEO_EXTENSIONS)
+
+
+def main(argv=None):
+    """Kayıtların önizleme görüntülerini üretir"""
+    parser = argparse.ArgumentParser(description="Kayıtlar için önizleme (kontak baskı) üretimi")
+    parser.add_argument('paths', nargs='*', default=['time_warp_videos'], help="Video dosyaları veya klasörler")
+    parser.add_argument('--count', type=int, default=9, help="Önizlemedeki kare sayısı")
+    parser.add_argument('--width', type=int, default=160, help="Küçük resim genişliği (piksel)")
+    parser.add_argument('--workers', type=int, help="Paralel iş parçacığı sayısı (varsayılan: CPU sayısı)")
+    parser.add_argument('--force', action='store_true', help="Güncel önizlemeleri de yeniden üret")
+    args = parser.parse_args(argv)
+
+    videos = []
+    for path in args.paths:
+        videos += find_videos(path) if os.path.isdir(path) else [path]
+    start = time.perf_counter()
+    results, cached = thumbnails(videos, args.count, args.width, args.workers, args.force)
+    elapsed = time.perf_counter() - start
+    failed = [video for video, path in results.items() if path is None]
+    for video in failed:
+        print(f"Video okunamadı: {video}")
+    print(f"{len(videos)} video, {len(videos) - cached - len(failed)} önizleme üretildi, {cached} önbellekten, "
+          f"{elapsed:.2f} sn")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+import os
+import tempfile
+import threading
+
+import cv2
+import numpy as np
+
+from encoders import create_encoder, measure_fps
+from frame_queue import BoundedFrameQueue, FramePool, QueueClosed
+from metrics import NULL_METRICS
+
+
+class StreamingRecorder:
+    """Kareleri kayıt sırasında arka planda diske yazan kaydedici
+
+    Kareler bütün çekim boyunca bellekte biriktirilmez; sınırlı bir kuyruk
+    üzerinden yazıcı iş parçacığına aktarılır ve geçici bir dosyaya akıtılır.
+    save() çağrısı yalnızca bir komut kuyruğa koyar, dosyanın kapatılıp son
+    adına taşınması yazıcı iş parçacığında yapılır; yakalama döngüsü beklemez.
+
+    fps verilmezse her çekimin ilk fps_probe karesi bekletilir ve FPS bu
+    karelerin zaman damgalarından ölçülür; kodlayıcı ölçülen değerle açılır,
+    böylece kaydedilen video kameranın gerçek hızında oynar.
+
+    Parametreler:
+    directory -- Geçici ve kaydedilen dosyaların klasörü
+    fps -- Video FPS değeri (None ise zaman damgalarından ölçülür)
+    codec -- Kodlayıcıya göre codec (None ise arka ucun varsayılanı)
+    queue_size -- Kuyrukta bekleyebilecek en fazla kare sayısı
+    policy -- Kuyruk dolunca davranış ('block', 'drop_oldest', 'drop_newest')
+    metrics -- Yazıcı iş parçacığındaki kayıt boyutuna ölçekleme ('kayıt ölçekleme') ve kodlama
+               ('kodlama') sürelerinin kaydedileceği StageMetrics; yakalamadaki
+               'ölçekleme' aşamasından ayrıdır, çünkü aşamalar tek iş parçacıklıdır
+    backend -- Kodlayıcı arka ucu ('opencv' veya 'ffmpeg')
+    fps_probe -- FPS ölçümü için bekletilecek kare sayısı
+    index -- Verilirse kaydedilen her çekim bu RecordingIndex'e eklenir
+    size -- Verilirse video bu (genişlik, yükseklik) boyutunda kaydedilir;
+            farklı boyuttaki kareler kodlanmadan önce yazıcı iş parçacığında
+            ölçeklenir (küçük boyutta işlenen efekt tam çözünürlükte kaydedilir)
+    """
+
+    def __init__(self, directory='time_warp_videos', fps=None, codec=None, queue_size=32, policy='block',
+                 metrics=None, backend='opencv', fps_probe=15, index=None, size=None):
+        self.directory = directory
+        self.fps = fps
+        self.fps_probe = fps_probe
+        self.metrics = metrics or NULL_METRICS
+        self.index = index
+        self.frames_written = 0  # Mevcut çekimde diske yazılan kare sayısı
+        self.frames_in_take = 0  # Mevcut çekim için kuyruğa giren kare sayısı
+        self._encoder = create_encoder(backend, codec)
+        self.extension = self._encoder.extension
+        # Kuyruk + FPS ölçümünde bekleyen + üreticideki + yazıcıdaki tampon kadar havuz yeterlidir
+        self._pool = FramePool(queue_size + fps_probe + 2)
+        self._queue = BoundedFrameQueue(queue_size, policy, on_drop=self._on_drop)
+        self._take = 0
+        self._temp_path = None
+        self.size = tuple(size) if size is not None else None
+        self._size = None  # Açık çekimin (genişlik, yükseklik) değeri
+        self._scaled = None  # Ölçeklenmiş kare tamponu (yazıcı iş parçacığına ait)
+        self._pending = []  # Kodlayıcı açılmadan önce bekletilen (tampon, zaman damgası) çiftleri
+        self._first_timestamp = None
+        self._last_timestamp = None
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        self._thread = threading.Thread(target=self._run, name='StreamingRecorder', daemon=True)
+        self._thread.start()
+
+    @property
+    def frames_dropped(self):
+        """Kuyruk politikası nedeniyle atılan toplam kare sayısı"""
+        return self._queue.dropped
+
+    def write(self, frame, timestamp=None):
+        """Kareyi kopyalayıp yazıcı kuyruğuna ekler
+
+        Parametreler:
+        frame -- Kaydedilecek kare
+        timestamp -- Karenin yakalanma zamanı (saniye); FPS ölçümü için kullanılır
+
+        Dönüş:
+        Kare kuyruğa girdiyse True, atıldıysa False
+        """
+        buffer = self._pool.acquire(frame.shape, frame.dtype)
+        np.copyto(buffer, frame)
+        accepted = self._queue.put(('frame', (buffer, timestamp)))
+        if accepted:
+            self.frames_in_take += 1
+        return accepted
+
+    def save(self, video_path, direction=None, filter_type=None):
+        """Mevcut çekimi sonlandırır ve video_path adıyla kaydeder (beklemeden)
+
+        direction ve filter_type kayıt dizinine yazılır.
+        """
+        self._queue.put(('save', (video_path, direction, filter_type)), droppable=False)
+        self.frames_in_take = 0
+
+    def discard(self):
+        """Mevcut çekimi siler ve yeni bir çekime başlar"""
+        self._queue.put(('discard', None), droppable=False)
+        self.frames_in_take = 0
+
+    def close(self, save_path=None):
+        """Yazıcı iş parçacığını bitirir
+
+        save_path verilirse kaydedilmemiş çekim o adla saklanır, aksi halde
+        etkileşimli moddaki gibi kaydedilmemiş kareler silinir.
+        """
+        if save_path is not None:
+            self.save(save_path)
+        else:
+            self.discard()
+        self._queue.close()
+        self._thread.join()
+
+    def _on_drop(self, item):
+        # Atılan karenin tamponunu havuza iade et
+        if item is not None and item[0] == 'frame':
+            self._pool.release(item[1][0])
+
+    def _run(self):
+        # Yazıcı iş parçacığı - kuyruk kapanıp boşalana kadar çalışır
+        while True:
+            try:
+                kind, payload = self._queue.get()
+            except QueueClosed:
+                break
+            try:
+                if kind == 'frame':
+                    self._write_frame(*payload)
+                elif kind == 'save':
+                    self._finish_take(*payload)
+                elif kind == 'discard':
+                    self._finish_take(None)
+            except Exception as e:
+                # Yazma hatası kaydı durdurmamalı
+                print(f"Kayıt hatası: {e}")
+
+    def _write_frame(self, frame, timestamp):
+        if timestamp is not None:
+            if self._first_timestamp is None:
+                self._first_timestamp = timestamp
+            self._last_timestamp = timestamp
+        if not self._encoder.is_open:
+            # FPS ölçülene kadar kareleri beklet
+            self._pending.append((frame, timestamp))
+            if self.fps is None and len(self._pending) < self.fps_probe:
+                return
+            self._open_take()
+            return
+        self._encode(frame)
+
+    def _encode(self, frame):
+        try:
+            data = frame
+            if frame.shape[1::-1] != self._size:
+                with self.metrics.stage('kayıt ölçekleme'):
+                    data = self._scaled = cv2.resize(frame, self._size, dst=self._scaled,
+                                                     interpolation=cv2.INTER_LINEAR)
+            with self.metrics.stage('kodlama'):
+                self._encoder.write(data)
+            self.frames_written += 1
+        finally:
+            self._pool.release(frame)
+
+    def _open_take(self):
+        # Çekimin ilk karelerinden FPS'i belirle, geçici dosyayı aç ve bekleyen kareleri yaz
+        pending, self._pending = self._pending, []
+        fps = self.fps
+        if fps is None:
+            fps = measure_fps([t for _, t in pending if t is not None])
+        height, width = pending[0][0].shape[:2]
+        self._size = self.size or (width, height)
+        width, height = self._size
+        self._take += 1
+        self._temp_path = os.path.join(self.directory,
+                                       f".recording_{os.getpid()}_{self._take}{self._encoder.extension}")
+        self.frames_written = 0
+        try:
+            self._encoder.open(self._temp_path, width, height, fps)
+        except Exception:
+            for frame, _ in pending:
+                self._pool.release(frame)
+            raise
+        for i, (frame, _) in enumerate(pending):
+            try:
+                self._encode(frame)
+            except Exception:
+                for rest, _ in pending[i + 1:]:
+                    self._pool.release(rest)
+                raise
+
+    def _finish_take(self, video_path, direction=None, filter_type=None):
+        if self._pending:
+            if video_path is None:
+                # Silinen kısa çekim - bekleyen kareleri havuza iade et
+                for frame, _ in self._pending:
+                    self._pool.release(frame)
+                self._pending = []
+            else:
+                # FPS ölçümü tamamlanmadan kaydedilen kısa çekim
+                self._open_take()
+        first, last = self._first_timestamp, self._last_timestamp
+        self._first_timestamp = self._last_timestamp = None
+        if not self._encoder.is_open:
+            if video_path is not None:
+                print("Kaydedilecek kare bulunamadı!")
+            return
+        self._encoder.close()
+        if video_path is None:
+            os.remove(self._temp_path)
+        else:
+            os.replace(self._temp_path, video_path)
+            measured = ""
+            if first is not None and last > first:
+                measured = f", ölçülen {(self.frames_written - 1) / (last - first):.1f} FPS"
+            print(f"Video başarıyla kaydedildi: {video_path} ({self.frames_written} kare, "
+                  f"{self._encoder.fps:.1f} FPS{measured}, kodlama {self._encoder.throughput:.0f} kare/sn)")
+            if self.index is not None:
+                self.index.add(video_path, self._size[0], self._size[1], self.frames_written, self._encoder.fps,
+                               direction, filter_type)
+        self._temp_path = None
+
+
+class FrameStore:
+    """Bütün çekimi tek parça önceden ayrılmış dizide tutan kare deposu
+
+    Kareler ayrı ayrı ndarray olarak değil, (kapasite, yükseklik, genişlik, kanal)
+    boyutunda tek bir dizide saklanır. RAM sınırı dolduğunda yeni kareler
+    şeffaf şekilde diskteki bir np.memmap dosyasına taşar. Böylece uzun
+    kayıtlarda en yüksek bellek kullanımı öngörülebilir kalır ve kare başına
+    bellek ayırma yapılmaz.
+
+    Parametreler:
+    ram_limit_mb -- Bellekte tutulacak kareler için üst sınır (MB)
+    spill_dir -- Taşma dosyasının oluşturulacağı klasör (None: sistem geçici klasörü)
+    """
+
+    def __init__(self, ram_limit_mb=1024, spill_dir=None):
+        self.ram_limit = int(ram_limit_mb * 1024 * 1024)
+        self.spill_dir = spill_dir
+        self._ram = None  # Bellekteki kareler
+        self._spill = None  # Diske taşan kareler (np.memmap)
+        self._spill_path = None
+        self._count = 0
+
+    @property
+    def spilled(self):
+        """Diske taşan kare sayısı"""
+        if self._ram is None:
+            return 0
+        return max(0, self._count - len(self._ram))
+
+    def append(self, frame):
+        """Kareyi depoya kopyalar"""
+        if self._ram is None or self._ram.shape[1:] != frame.shape or self._ram.dtype != frame.dtype:
+            self._allocate(frame.shape, frame.dtype)
+        index = self._count
+        if index < len(self._ram):
+            np.copyto(self._ram[index], frame)
+        else:
+            index -= len(self._ram)
+            if self._spill is None or index >= len(self._spill):
+                self._grow_spill(index + 1)
+            np.copyto(self._spill[index], frame)
+        self._count += 1
+
+    def clear(self):
+        """Depoyu boşaltır; ayrılmış bellek ve taşma dosyası sonraki çekim için korunur"""
+        self._count = 0
+
+    def close(self):
+        """Taşma dosyasını siler ve belleği bırakır"""
+        self._release_spill()
+        self._ram = None
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        if index < len(self._ram):
+            return self._ram[index]
+        return self._spill[index - len(self._ram)]
+
+    def __iter__(self):
+        # Kopya üretmeden kareleri sırayla döndür
+        ram_count = min(self._count, 0 if self._ram is None else len(self._ram))
+        for i in range(ram_count):
+            yield self._ram[i]
+        for i in range(self._count - ram_count):
+            yield self._spill[i]
+
+    def _allocate(self, shape, dtype):
+        # RAM sınırına sığan kadar kareyi tek dizide ayır. np.empty sayfaları
+        # ancak yazıldıkça belleğe girer, bu yüzden kısa çekimler sınırın tamamını kullanmaz.
+        self._release_spill()
+        frame_bytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        capacity = max(1, self.ram_limit // frame_bytes)
+        self._ram = np.empty((capacity,) + tuple(shape), dtype)
+        self._count = 0
+
+    def _grow_spill(self, needed):
+        # Taşma dosyasını ikiye katlayarak büyüt (her karede yeniden eşleme yapılmaz)
+        shape, dtype = self._ram.shape[1:], self._ram.dtype
+        old = 0 if self._spill is None else len(self._spill)
+        capacity = max(needed, old * 2, 16)
+        if self._spill_path is None:
+            fd, self._spill_path = tempfile.mkstemp(prefix='time_warp_spill_', suffix='.raw', dir=self.spill_dir)
+            os.close(fd)
+            print(f"Bellek sınırına ulaşıldı, kareler diske taşınıyor: {self._spill_path}")
+        if self._spill is not None:
+            self._spill.flush()
+            self._spill = None
+        frame_bytes = int(np.prod(shape)) * dtype.itemsize
+        with open(self._spill_path, 'r+b') as f:
+            f.truncate(capacity * frame_bytes)
+        self._spill = np.memmap(self._spill_path, dtype=dtype, mode='r+', shape=(capacity,) + tuple(shape))
+
+    def _release_spill(self):
+        self._spill = None
+        if self._spill_path is not None:
+            try:
+                os.remove(self._spill_path)
+            except OSError:
+                pass
+            self._spill_path = None
@@ -0,0 +1,220 @@
+import argparse
+import contextlib
+import os
+import re
+import sqlite3
+import time
+
+import cv2
+
+# Dizinde dizinlenen video uzantıları
+VIDEO_EXTENSIONS = ('.avi', '.mp4')
+INDEX_NAME = 'recordings.sqlite'
+
+# Headless çıktı adlarındaki tarama yönü ve filtre (offline_output_path)
+_SETTINGS_PATTERN = re.compile(r'_d([123])_f(\d)$')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS recordings (
+    name TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    width INTEGER,
+    height INTEGER,
+    frames INTEGER,
+    fps REAL,
+    duration REAL,
+    direction TEXT,
+    filter INTEGER,
+    indexed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS recordings_mtime ON recordings (mtime);
+CREATE INDEX IF NOT EXISTS recordings_settings ON recordings (direction, filter);
+"""
+
+_COLUMNS = ('name', 'size', 'mtime', 'width', 'height', 'frames', 'fps', 'duration', 'direction', 'filter',
+            'indexed_at')
+
+
+class RecordingIndex:
+    """Kayıt klasöründeki videoların SQLite dizini
+
+    Her kayıt için dosya boyutu, değiştirilme zamanı, çözünürlük, kare sayısı,
+    FPS, süre, tarama yönü ve filtre saklanır; listeleme ve sorgular videoları
+    açmadan dizinden yapılır. Kayıtlar kaydedilirken add() ile eklenir,
+    rescan() klasörü boyut ve değiştirilme zamanına göre karşılaştırıp yalnızca
+    yeni veya değişmiş dosyaları OpenCV ile okur.
+
+    Her işlem kendi bağlantısını açıp kapatır; bu yüzden dizin arka plan kayıt iş
+    parçacığından da güvenle güncellenebilir.
+
+    Parametreler:
+    directory -- Kayıt klasörü (dizin dosyası da bu klasörde tutulur)
+    """
+
+    def __init__(self, directory='time_warp_videos'):
+        self.directory = directory
+        self.path = os.path.join(directory, INDEX_NAME)
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        # Bloğu tek işlem (transaction) olarak çalıştırır ve bağlantıyı kapatır;
+        # sqlite3.Connection'ın kendi with bloğu yalnızca commit/rollback yapar
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            conn.row_factory = sqlite3.Row
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def add(self, video_path, width, height, frames, fps, direction=None, filter_type=None):
+        """Kaydedilen videoyu dizine ekler (varsa günceller)
+
+        Parametreler:
+        video_path -- Klasördeki video dosyası
+        width, height -- Çözünürlük
+        frames -- Kare sayısı
+        fps -- Video FPS değeri
+        direction -- Tarama yönü ('1', '2' veya '3'; bilinmiyorsa None)
+        filter_type -- Kayıt anındaki filtre (0-5; bilinmiyorsa None)
+        """
+        stat = os.stat(video_path)
+        duration = frames / fps if fps else None
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO recordings VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                         (os.path.basename(video_path), stat.st_size, stat.st_mtime, width, height, frames, fps,
+                          duration, direction, filter_type, time.time()))
+
+    def query(self, direction=None, filter_type=None, min_duration=None, width=None, height=None, limit=None):
+        """Dizindeki kayıtları en yeniden eskiye sözlük listesi olarak döndürür
+
+        Verilen her koşul sonucu daraltır; 'path' anahtarı dosyanın tam yoludur.
+        """
+        conditions, values = [], []
+        for column, value in (('direction', direction), ('filter', filter_type), ('width', width),
+                              ('height', height)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                values.append(value)
+        if min_duration is not None:
+            conditions.append("duration >= ?")
+            values.append(min_duration)
+        sql = "SELECT * FROM recordings"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY mtime DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            values.append(limit)
+        with self._connect() as conn:
+            rows = conn.execute(sql, values).fetchall()
+        return [dict(row, path=os.path.join(self.directory, row['name'])) for row in rows]
+
+    def rescan(self):
+        """Dizini klasörle eşitler
+
+        Boyutu ve değiştirilme zamanı dizindekiyle aynı olan dosyalar açılmaz;
+        yeni ve değişmiş dosyalar okunur, silinmiş dosyalar dizinden çıkarılır.
+        Değişmiş dosyanın kayıttaki yön/filtre bilgisi korunur; yeni dosyada
+        headless çıktı adından (..._d1_f3.avi) okunur.
+
+        Dönüş:
+        {'added', 'updated', 'removed', 'unchanged', 'failed'} sayıları
+        """
+        counts = dict.fromkeys(('added', 'updated', 'removed', 'unchanged', 'failed'), 0)
+        with self._connect() as conn:
+            known = {row['name']: row for row in conn.execute("SELECT * FROM recordings")}
+        names = set()
+        for entry in os.scandir(self.directory):
+            stem, extension = os.path.splitext(entry.name)
+            # Noktayla başlayanlar yazılmakta olan geçici çekimlerdir
+            if entry.name.startswith('.') or extension.lower() not in VIDEO_EXTENSIONS or not entry.is_file():
+                continue
+            names.add(entry.name)
+            stat = entry.stat()
+            row = known.get(entry.name)
+            if row is not None and row['size'] == stat.st_size and row['mtime'] == stat.st_mtime:
+                counts['unchanged'] += 1
+                continue
+            info = probe_video(entry.path)
+            if info is None:
+                print(f"Video okunamadı: {entry.path}")
+                counts['failed'] += 1
+                continue
+            if row is not None:
+                direction, filter_type = row['direction'], row['filter']
+            else:
+                match = _SETTINGS_PATTERN.search(stem)
+                direction, filter_type = (match.group(1), int(match.group(2))) if match else (None, None)
+            self.add(entry.path, *info, direction=direction, filter_type=filter_type)
+            counts['updated' if row is not None else 'added'] += 1
+        removed = [name for name in known if name not in names]
+        if removed:
+            with self._connect() as conn:
+                conn.executemany("DELETE FROM recordings WHERE name = ?", [(name,) for name in removed])
+        counts['removed'] = len(removed)
+        return counts
+
+
+def probe_video(path):
+    """Video dosyasının (genişlik, yükseklik, kare sayısı, FPS) bilgisini okur
+
+    Kareler çözülmez, yalnızca kap başlığı okunur. Açılamazsa None döner.
+    """
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        return None
+    try:
+        return (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), cap.get(cv2.CAP_PROP_FPS))
+    finally:
+        cap.release()
+
+
+def print_recordings(rows):
+    """Kayıtları tablo olarak yazar"""
+    print(f"{'dosya':<48}{'boyut':>10}{'çözünürlük':>12}{'kare':>7}{'FPS':>7}{'süre':>8}{'yön':>5}{'filtre':>7}")
+    for row in rows:
+        size = f"{row['size'] / 1e6:.1f} MB"
+        resolution = f"{row['width']}x{row['height']}"
+        duration = f"{row['duration']:.1f} sn" if row['duration'] else "-"
+        direction = row['direction'] or "-"
+        filter_type = "-" if row['filter'] is None else row['filter']
+        print(f"{row['name']:<48}{size:>10}{resolution:>12}{row['frames']:>7}{row['fps']:>7.1f}{duration:>8}"
+              f"{direction:>5}{filter_type:>7}")
+    print(f"{len(rows)} kayıt")
+
+
+def main(argv=None):
+    """Kayıt dizinini listeler, sorgular veya yeniden tarar"""
+    parser = argparse.ArgumentParser(description="Time Warp kayıt dizini")
+    parser.add_argument('--dir', default='time_warp_videos', help="Kayıt klasörü")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    listing = commands.add_parser('list', help="Dizindeki kayıtları listele")
+    listing.add_argument('--direction', choices=['1', '2', '3'], help="Yalnızca bu tarama yönü")
+    listing.add_argument('--filter', type=int, choices=range(6), help="Yalnızca bu filtre")
+    listing.add_argument('--min-duration', type=float, help="En kısa süre (saniye)")
+    listing.add_argument('--limit', type=int, help="En fazla kayıt sayısı")
+
+    commands.add_parser('rescan', help="Klasörü tarayıp yeni/değişmiş dosyaları dizine ekle")
+    args = parser.parse_args(argv)
+
+    index = RecordingIndex(args.dir)
+    if args.command == 'rescan':
+        start = time.perf_counter()
+        counts = index.rescan()
+        print(f"{counts['added']} eklendi, {counts['updated']} güncellendi, {counts['removed']} silindi, "
+              f"{counts['unchanged']} değişmedi, {counts['failed']} okunamadı "
+              f"({time.perf_counter() - start:.2f} sn)")
+    else:
+        print_recordings(index.query(args.direction, args.filter, args.min_duration, limit=args.limit))
+
+
+if __name__ == "__main__":
+    main()
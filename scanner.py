@@ -0,0 +1,314 @@
+import cv2
+import numpy as np
+
+from filters import apply_filter, FILTER_NAMES
+from metrics import NULL_METRICS
+
+
+class ScanClock:
+    """Tarama çizgilerini kare sayısı yerine zaman damgalarıyla ilerletir
+
+    Çizgi konumu geçen süreden hesaplanır: sweep_seconds saniyede bir eksen
+    baştan sona taranır. Kare geç gelirse çizgi aradaki bütün satır/sütunları
+    tek seferde atlar (ve tarayıcı onları filtreler), böylece efektin hızı
+    makinenin yüküne bağlı değildir. Dosya girişinde sunum zaman damgaları
+    kullanıldığı için çıktı işleme hızından bağımsız olarak hep aynıdır.
+    Duraklatılan süre sayılmaz.
+
+    Parametreler:
+    sweep_seconds -- Bir eksenin baştan sona taranma süresi (saniye)
+    """
+
+    __slots__ = ('sweep_seconds', 'elapsed', '_last')
+
+    def __init__(self, sweep_seconds):
+        self.sweep_seconds = sweep_seconds
+        self.reset()
+
+    def reset(self):
+        """Saati taramanın başına döndürür"""
+        self.elapsed = 0.0  # Duraklatmalar hariç geçen süre
+        self._last = None
+
+    def targets(self, timestamp, paused, height, width):
+        """Bu karenin zaman damgasına göre tarama çizgilerinin hedef konumları
+
+        Dönüş:
+        (dikey hedef satır, yatay hedef sütun)
+        """
+        if self._last is not None and not paused:
+            self.elapsed += max(0.0, timestamp - self._last)
+        self._last = timestamp
+        progress = min(1.0, self.elapsed / self.sweep_seconds)
+        return int(progress * height), int(progress * width)
+
+
+def scan_band_end(pos, step, length, timed):
+    """Bu karede filtrelenecek bandın bitişi; filtrelenecek bant yoksa None
+
+    Kare sayacıyla taramada son bant (çizgi kenara ulaştığında) her zamanki
+    gibi filtrelenmez. Zaman saatinde çizginin atladığı bütün satır/sütunlar
+    kenara kadar filtrelenir.
+    """
+    if timed:
+        return pos + step if step > 0 else None
+    # Kesirli tarama hızında çizgi bazı karelerde hiç ilerlemez (step 0)
+    return pos + step if 0 < step and pos < length - step else None
+
+
+class TimeWarpScanner:
+    """Time Warp Scan efektinin arayüzden bağımsız motoru
+
+    Tarama çizgisi konumları, tamamlanma/duraklatma durumu ve taranmış
+    (dondurulmuş) kısımları biriktiren sonuç görüntüsü bu nesnede tutulur.
+    step() her kare için efekti uygular; pencere, klavye veya input() ile
+    ilişkisi yoktur, sunucu ve toplu işlerden doğrudan çağrılabilir. Bütün
+    tamponlar oluşturulurken ayrılır, kare başına bellek ayrılmaz.
+
+    Nesne iş parçacığı güvenli değildir; step() ile reset()/set_filter()
+    farklı iş parçacıklarından çağrılıyorsa çağıran kilitlemelidir.
+
+    Parametreler:
+    width, height -- Kare boyutu
+    direction -- Tarama yönü ('1': yukarıdan aşağıya, '2': soldan sağa, '3': çift yönlü)
+    filter_type -- Taranan kısma uygulanacak filtre (0-5 arası değer)
+    scan_speed -- Tarama hızı (piksel/kare); kesirli olabilir, çizgi tam
+                  piksellerde ilerler ama ortalama hız korunur
+    sweep_seconds -- Verilirse tarama kare sayısıyla değil zamanla ilerler:
+                     bir eksenin taranma süresi (saniye); step() zaman damgası ister
+    metrics -- Aşama sürelerinin ('kopya', 'filtre', 'çizgi') kaydedileceği StageMetrics
+    verbose -- Tarama tamamlandığında konsola mesaj yazılsın mı?
+    """
+
+    __slots__ = ('width', 'height', 'direction', 'filter_type', 'scan_speed', 'clock', 'metrics', 'verbose',
+                 'pos_v', 'pos_h', 'completed_v', 'completed_h', 'paused', 'result', '_out', '_filter_band',
+                 '_draw_line', '_travel_v', '_travel_h')
+
+    def __init__(self, width, height, direction='1', filter_type=0, scan_speed=2, sweep_seconds=None,
+                 metrics=None, verbose=False):
+        if direction not in ('1', '2', '3'):
+            raise ValueError(f"Geçersiz tarama yönü: {direction}")
+        self.width = width
+        self.height = height
+        self.direction = direction
+        self.scan_speed = scan_speed
+        self.clock = ScanClock(sweep_seconds) if sweep_seconds else None
+        self.metrics = metrics or NULL_METRICS
+        self.verbose = verbose
+        self.set_filter(filter_type)
+        self.result = np.zeros((height, width, 3), np.uint8)
+        self._out = np.empty_like(self.result)
+        # Ölçüm kapalıyken wrap() fonksiyonun kendisini döndürür, ek maliyet olmaz
+        self._filter_band = self.metrics.wrap('filtre', apply_filter)
+        self._draw_line = self.metrics.wrap('çizgi', cv2.line)
+        self.reset()
+
+    @property
+    def completed(self):
+        """En az bir eksenin taraması tamamlandı mı? (kaydetmeye hazır)"""
+        return self.completed_v or self.completed_h
+
+    @property
+    def finished(self):
+        """Seçilen yöndeki bütün taramalar tamamlandı mı? (çizgiler artık ilerlemez)"""
+        if self.direction == '3':
+            return self.completed_v and self.completed_h
+        return self.completed_v if self.direction == '1' else self.completed_h
+
+    def reset(self):
+        """Efekti başlangıç durumuna getirir (sonuç siyah, çizgiler başta)"""
+        self.result.fill(0)
+        self.pos_v = 0  # Dikey tarama için (yukarıdan aşağıya)
+        self.pos_h = 0  # Yatay tarama için (soldan sağa)
+        # Kare sayacıyla taramada çizgilerin kesirli konumları (pos_* tam kısımlarıdır)
+        self._travel_v = 0.0
+        self._travel_h = 0.0
+        self.completed_v = False
+        self.completed_h = False
+        self.paused = False
+        if self.clock:
+            self.clock.reset()
+
+    def set_filter(self, filter_type):
+        """Bundan sonra taranan kısma uygulanacak filtreyi seçer"""
+        if filter_type not in range(len(FILTER_NAMES)):
+            raise ValueError(f"Geçersiz filtre: {filter_type}")
+        self.filter_type = filter_type
+
+    def step(self, frame, out=None, timestamp=None):
+        """Bir kareyi işler ve gösterilecek/kaydedilecek görüntüyü döndürür
+
+        Parametreler:
+        frame -- Aynalanmış kamera/video karesi (height x width x 3, salt okunur kullanılır)
+        out -- Sonucun yazılacağı tampon; None ise iç tampon kullanılır ve
+               sonraki step() çağrısında üzerine yazılır
+        timestamp -- Karenin zaman damgası (saniye); zamanla taramada gerekli
+
+        Dönüş:
+        out (taranmış kısımlar, canlı kısım ve tarama çizgileri)
+        """
+        if frame.shape[:2] != (self.height, self.width):
+            raise ValueError(f"Kare boyutu {frame.shape[:2]}, beklenen {(self.height, self.width)}")
+        if out is None:
+            out = self._out
+        # Mevcut sonuç görüntüsünü çıktı tamponuna kopyala (üzerinde değişiklik yapılacak)
+        with self.metrics.stage('kopya'):
+            np.copyto(out, self.result)
+        targets = None
+        if self.clock:
+            if timestamp is None:
+                raise ValueError("Zamanla taramada zaman damgası gerekli")
+            targets = self.clock.targets(timestamp, self.paused, self.height, self.width)
+        self._scan(frame, out, targets)
+        return out
+
+    def _scan(self, frame, out, targets):
+        height, width = self.height, self.width
+        result = self.result
+        filter_band, draw_line = self._filter_band, self._draw_line
+
+        # Bu karede her eksende kaç piksel ilerleneceği
+        timed = targets is not None
+        if timed:
+            step_v = max(0, targets[0] - self.pos_v)
+            step_h = max(0, targets[1] - self.pos_h)
+        else:
+            # Kesirli hız: konum ondalıklı birikir, çizgi tam piksellerde ilerler
+            step_v = int(self._travel_v + self.scan_speed) - self.pos_v
+            step_h = int(self._travel_h + self.scan_speed) - self.pos_h
+
+        # Tarama yönüne göre işlemleri yap
+        # Çift yönlü tarama - hem yatay hem dikey
+        if self.direction == '3':
+            try:
+                # Önce yatay (soldan sağa) taramayı işle
+                if self.pos_h < width and not self.paused:
+                    # Yatay tarama - geçtiği kısım filtrelenir
+                    if not self.completed_h:
+                        pos = self.pos_h
+                        # Tarama çizgisinin geçtiği kısımın boş olmadığından emin ol
+                        end = scan_band_end(pos, step_h, width, timed)
+                        if end is not None:
+                            # Mevcut sütunlara bütün kare bağlamında filtre uygula, sonucu doğrudan sonuç görüntüsüne yaz
+                            filter_band(frame, self.filter_type, out=result[:, pos:end],
+                                        region=(slice(None), slice(pos, end)))
+                        # Tarama çizgisinin pozisyonunu güncelle
+                        self.pos_h += step_h
+                        self._travel_h += self.scan_speed
+                        # Eğer yatay tarama tamamlandıysa bunu işaretle
+                        if self.pos_h >= width:
+                            self.completed_h = True
+                            if self.verbose:
+                                print("Yatay tarama tamamlandı!")
+
+                # Sonra dikey (yukarıdan aşağıya) taramayı işle
+                if self.pos_v < height and not self.paused:
+                    # Dikey tarama - geçtiği kısım filtrelenir
+                    if not self.completed_v:
+                        pos = self.pos_v
+                        # Tarama çizgisinin geçtiği kısımın boş olmadığından emin ol
+                        end = scan_band_end(pos, step_v, height, timed)
+                        if end is not None:
+                            # Mevcut satırlara bütün kare bağlamında filtre uygula, sonucu doğrudan sonuç görüntüsüne yaz
+                            filter_band(frame, self.filter_type, out=result[pos:end, :],
+                                        region=(slice(pos, end), slice(None)))
+                        # Tarama çizgisinin pozisyonunu güncelle
+                        self.pos_v += step_v
+                        self._travel_v += self.scan_speed
+                        # Eğer dikey tarama tamamlandıysa bunu işaretle
+                        if self.pos_v >= height:
+                            self.completed_v = True
+                            if self.verbose:
+                                print("Dikey tarama tamamlandı!")
+
+                pos_h, pos_v = self.pos_h, self.pos_v
+                # Henüz taranmamış kısımları canlı kameradan al
+                if pos_h < width:
+                    # Yatay çizginin sağındaki kısmı canlı kameradan al
+                    out[:, pos_h:] = frame[:, pos_h:]
+                if pos_v < height:
+                    # Dikey çizginin altındaki ve yatay çizginin solundaki kısmı güncelle
+                    out[pos_v:, :pos_h] = frame[pos_v:, :pos_h]
+
+                # Tarama çizgilerini çiz
+                if pos_h < width:
+                    # Yatay tarama için mavi dikey çizgi çiz
+                    draw_line(out, (pos_h, 0), (pos_h, height), (255, 0, 0), 2)
+                if pos_v < height:
+                    # Dikey tarama için yeşil yatay çizgi çiz
+                    draw_line(out, (0, pos_v), (width, pos_v), (0, 255, 0), 2)
+            except Exception as e:
+                # Hata yakalama - hata durumunda çökmeyi önle
+                print(f"Çift yönlü tarama hatası: {e}")
+
+        elif self.direction == '1':  # Yukarıdan Aşağıya tarama
+            try:
+                pos = self.pos_v
+                if pos < height and not self.paused:
+                    # Tarama çizgisinden sonraki kısmı canlı kameradan al
+                    out[pos:, :] = frame[pos:, :]
+
+                    # Tarama çizgisinin geçtiği kısmı filtreleyerek sonuç görüntüsüne kaydet
+                    # Taşma olmamasını sağla
+                    end = scan_band_end(pos, step_v, height, timed)
+                    if end is not None:
+                        # Mevcut satırlara bütün kare bağlamında filtre uygula, sonucu doğrudan sonuç görüntüsüne yaz
+                        filter_band(frame, self.filter_type, out=result[pos:end, :],
+                                    region=(slice(pos, end), slice(None)))
+
+                    # Tarama çizgisinin pozisyonunu güncelle
+                    self.pos_v += step_v
+                    self._travel_v += self.scan_speed
+
+                    # Tarama tamamlandı mı kontrol et
+                    if self.pos_v >= height and not self.completed_v:
+                        self.completed_v = True
+                        if self.verbose:
+                            print("Tarama tamamlandı! Videoyu kaydetmek için 's' tuşuna basın.")
+                else:
+                    # Duraklatıldığında canlı kamera görüntüsünü tarama çizgisinin altında göster
+                    out[pos:, :] = frame[pos:, :]
+
+                # Tarama çizgisini çiz (mavi renkte)
+                if self.pos_v < height:
+                    # Yatay mavi çizgi çiz
+                    draw_line(out, (0, self.pos_v), (width, self.pos_v), (255, 0, 0), 2)
+            except Exception as e:
+                # Hata yakalama
+                print(f"Dikey tarama hatası: {e}")
+
+        else:  # Soldan Sağa tarama
+            try:
+                pos = self.pos_h
+                if pos < width and not self.paused:
+                    # Tarama çizgisinden sonraki kısmı canlı kameradan al
+                    out[:, pos:] = frame[:, pos:]
+
+                    # Tarama çizgisinin geçtiği kısmı filtreleyerek sonuç görüntüsüne kaydet
+                    # Taşma olmamasını sağla
+                    end = scan_band_end(pos, step_h, width, timed)
+                    if end is not None:
+                        # Mevcut sütunlara bütün kare bağlamında filtre uygula, sonucu doğrudan sonuç görüntüsüne yaz
+                        filter_band(frame, self.filter_type, out=result[:, pos:end],
+                                    region=(slice(None), slice(pos, end)))
+
+                    # Tarama çizgisinin pozisyonunu güncelle
+                    self.pos_h += step_h
+                    self._travel_h += self.scan_speed
+
+                    # Tarama tamamlandı mı kontrol et
+                    if self.pos_h >= width and not self.completed_h:
+                        self.completed_h = True
+                        if self.verbose:
+                            print("Tarama tamamlandı! Videoyu kaydetmek için 's' tuşuna basın.")
+                else:
+                    # Duraklatıldığında canlı kamera görüntüsünü tarama çizgisinin sağında göster
+                    out[:, pos:] = frame[:, pos:]
+
+                # Tarama çizgisini çiz (mavi renkte)
+                if self.pos_h < width:
+                    # Dikey mavi çizgi çiz
+                    draw_line(out, (self.pos_h, 0), (self.pos_h, height), (255, 0, 0), 2)
+            except Exception as e:
+                # Hata yakalama
+                print(f"Yatay tarama hatası: {e}")